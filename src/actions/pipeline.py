@@ -0,0 +1,343 @@
+import argparse
+import queue
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from src.actions.scrape_jobs import (
+    DEFAULT_DETAIL_WORKERS,
+    DETAIL_FLUSH_SIZE,
+    DETAIL_WORKERS_MAP,
+    get_scraper_for_company,
+    iter_listing_pages,
+    partition_listings,
+    record_verdict,
+)
+from src.filters.ai_matcher import (
+    AIMatcher,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_PROMPT_MODE,
+    OllamaClient,
+)
+from src.filters.qualifications import QualificationFilter
+from src.models.company import CompanyScrapers
+from src.models.resume import Resume
+from src.monitoring.metrics import METRICS, add_metrics_arguments, finish_metrics, start_metrics
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.http_client import HttpClient
+from src.storage.jobs_db import JobsDatabase
+
+# Jobs buffered between two stages before the upstream stage blocks
+QUEUE_SIZE = 100
+# Poll interval for blocked stages to notice that the pipeline was stopped
+POLL_INTERVAL = 0.1
+
+# Sent downstream once per consumer when a stage has no more jobs
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    """Counters and latencies collected during one pipeline run"""
+
+    company: str
+    listings: int = 0
+    to_enrich: int = 0
+    enriched: int = 0
+    failed: int = 0
+    text_matches: int = 0
+    ai_verdicts: int = 0
+    ai_matches: int = 0
+    # Seconds from the start of the run to the first stored verdict
+    first_verdict_after: Optional[float] = None
+    # Seconds from a listing being seen to its verdict being stored
+    verdict_latencies: List[float] = field(default_factory=list)
+    wall_time: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        text = (
+            f"{self.company}: {self.listings} listings, {self.to_enrich} to enrich, "
+            f"{self.enriched} stored, {self.failed} failed, {self.text_matches} text matches, "
+            f"{self.ai_matches}/{self.ai_verdicts} AI matches in {self.wall_time:.1f}s"
+        )
+        if self.verdict_latencies:
+            text += (
+                f"; first verdict after {self.first_verdict_after:.1f}s, listing-to-verdict "
+                f"median {statistics.median(self.verdict_latencies):.1f}s, "
+                f"max {max(self.verdict_latencies):.1f}s"
+            )
+        return text
+
+
+class StreamingPipeline:
+    """
+    Runs scrape, persist, text filter and AI filter for one company as
+    concurrent stages joined by bounded queues.
+
+    Listing, dedupe and change detection work as in scrape_jobs_for_company.
+    Every enriched posting is written with its text_match result. Postings
+    that pass the text filter are flushed to the database and go straight to
+    the LLM; their verdicts are stored one by one as they arrive. Without a
+    resume the AI stage is skipped. The embedding pre-rank needs the full
+    candidate set, so it is not part of the stream.
+    """
+
+    def __init__(
+        self,
+        company_name: CompanyScrapers,
+        resume_text: Optional[str] = None,
+        force_refresh: bool = False,
+        http_client: Optional[HttpClient] = None,
+        db: Optional[JobsDatabase] = None,
+        ollama_client: Optional[OllamaClient] = None,
+        detail_workers: Optional[int] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        queue_size: int = QUEUE_SIZE,
+        prompt_mode: str = DEFAULT_PROMPT_MODE,
+        structured: bool = True,
+        strict: bool = False,
+    ):
+        self.company_name = company_name
+        self.resume_text = resume_text
+        self.force_refresh = force_refresh
+        self.http_client = http_client
+        # A database the pipeline opened itself is closed at the end of run()
+        self._owns_db = db is None
+        self.db = db or JobsDatabase()
+        self.ollama_client = ollama_client
+        self.detail_workers = detail_workers or DETAIL_WORKERS_MAP.get(
+            company_name, DEFAULT_DETAIL_WORKERS
+        )
+        self.ai_workers = max_in_flight if resume_text else 0
+        self.prompt_mode = prompt_mode
+        self.structured = structured
+        self.text_filter = QualificationFilter(strict=strict)
+        self.stats = PipelineStats(company=company_name.value)
+
+        self._listing_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._detail_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._ai_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        # Job id -> time its listing was seen, for listing-to-verdict latency
+        self._seen_at: Dict[str, float] = {}
+        # Listings whose hash changed; their cached detail pages are revalidated
+        self._changed_ids: Set[str] = set()
+        self._start = 0.0
+        self.scraper = None
+        self.matcher: Optional[AIMatcher] = None
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _run_stage(self, name: str, target):
+        try:
+            target()
+        except Exception as e:
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            with self._stats_lock:
+                self.stats.errors.append(f"{name}: {e}")
+            print(f"Pipeline stage {name} failed, stopping: {e}")
+            self._stop.set()
+
+    def _listing_stage(self):
+        known_hashes = self.db.get_job_hashes(self.company_name)
+        seen_ids = set()
+        try:
+            for listing_page in iter_listing_pages(self.scraper):
+                if self._stop.is_set():
+                    return
+                job_listings = listing_page.jobs
+                prev_size = len(seen_ids)
+                seen_ids.update(job.id for job in job_listings)
+                # A page with no unseen ids means the site is repeating itself
+                if len(seen_ids) == prev_size:
+                    break
+
+                new_jobs, changed_jobs, unhashed = partition_listings(
+                    job_listings, known_hashes
+                )
+                if unhashed:
+                    self.db.update_content_hashes(self.company_name, unhashed)
+                    known_hashes.update(unhashed)
+                to_enrich = job_listings if self.force_refresh else new_jobs + changed_jobs
+                self._changed_ids.update(job.id for job in changed_jobs)
+
+                with self._stats_lock:
+                    self.stats.listings += len(job_listings)
+                    self.stats.to_enrich += len(to_enrich)
+                now = time.monotonic()
+                for job in to_enrich:
+                    self._seen_at[job.id] = now
+                    known_hashes[job.id] = job.content_hash
+                    if not self._put(self._listing_queue, job):
+                        return
+        finally:
+            for _ in range(self.detail_workers):
+                self._put(self._listing_queue, _DONE)
+
+    def _detail_stage(self):
+        try:
+            while (job := self._get(self._listing_queue)) is not _DONE:
+                try:
+                    job_with_details = self.scraper.get_job_with_details(
+                        job, revalidate=job.id in self._changed_ids
+                    )
+                except Exception as e:
+                    if isinstance(e, KeyboardInterrupt):
+                        raise
+                    print(f"Error processing job {job.id}: {e}")
+                    job_with_details = None
+                if job_with_details is None:
+                    with self._stats_lock:
+                        self.stats.failed += 1
+                    continue
+                if not self._put(self._detail_queue, job_with_details):
+                    return
+        finally:
+            self._put(self._detail_queue, _DONE)
+
+    def _persist_stage(self):
+        finished_workers = 0
+        try:
+            with self.db.batch_writer(flush_size=DETAIL_FLUSH_SIZE) as writer:
+                while finished_workers < self.detail_workers:
+                    job = self._get(self._detail_queue)
+                    if job is _DONE:
+                        if self._stop.is_set():
+                            return
+                        finished_workers += 1
+                        continue
+                    with METRICS.timer("filter_job_seconds", filter="text"):
+                        result = self.text_filter.check(job)
+                    METRICS.inc(
+                        "filter_jobs_total", filter="text",
+                        result="passed" if result.passed else "rejected",
+                    )
+                    job.text_match = result.passed
+                    writer.add_job(job, self.company_name)
+                    with self._stats_lock:
+                        self.stats.enriched += 1
+                        self.stats.text_matches += result.passed
+                    if result.passed and self.ai_workers:
+                        # The verdict updates this row, so it must be written first
+                        writer.flush()
+                        if not self._put(self._ai_queue, job):
+                            return
+        finally:
+            for _ in range(self.ai_workers):
+                self._put(self._ai_queue, _DONE)
+
+    def _ai_stage(self):
+        while (job := self._get(self._ai_queue)) is not _DONE:
+            with METRICS.timer("filter_job_seconds", filter="ai"):
+                verdict = self.matcher.match_cached(job)
+            record_verdict(verdict)
+            if verdict.error:
+                print(f"Error processing job {job.id}: {verdict.error}")
+                continue
+            if not verdict.cached:
+                print(f"OLLAMA RESPONSE FOR JOB {job.id}: {verdict.answer}")
+            # Written straight away: time to a stored verdict is what the
+            # pipeline is for, and the LLM call dwarfs a single-row update
+            self.db.update_ai_matches(
+                [(self.company_name, job.id, verdict.is_match, verdict.answer, verdict.score)]
+            )
+            now = time.monotonic()
+            with self._stats_lock:
+                self.stats.ai_verdicts += 1
+                self.stats.ai_matches += verdict.is_match
+                if self.stats.first_verdict_after is None:
+                    self.stats.first_verdict_after = now - self._start
+                if job.id in self._seen_at:
+                    self.stats.verdict_latencies.append(now - self._seen_at[job.id])
+            if job.id in self._seen_at:
+                METRICS.observe(
+                    "pipeline_listing_to_verdict_seconds", now - self._seen_at[job.id],
+                    company=self.company_name.value,
+                )
+
+    def run(self) -> PipelineStats:
+        self._start = time.monotonic()
+        http_client = self.http_client or HttpClient(
+            cache=HttpCache(revalidate=self.force_refresh)
+        )
+        self.scraper = get_scraper_for_company(self.company_name, http_client)
+        if self.ai_workers:
+            self.matcher = AIMatcher(
+                self.resume_text,
+                client=self.ollama_client,
+                max_in_flight=self.ai_workers,
+                cache=self.db,
+                prompt_mode=self.prompt_mode,
+                structured=self.structured,
+            )
+
+        stages = [("listings", self._listing_stage)]
+        stages += [("details", self._detail_stage)] * self.detail_workers
+        stages += [("persist", self._persist_stage)]
+        stages += [("ai", self._ai_stage)] * self.ai_workers
+        threads = [
+            threading.Thread(target=self._run_stage, args=stage, name=f"pipeline-{stage[0]}")
+            for stage in stages
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._stop.set()
+            self.scraper.close()
+            if self.matcher is not None:
+                self.matcher.close()
+            if self._owns_db:
+                self.db.close()
+
+        self.stats.wall_time = time.monotonic() - self._start
+        if self.matcher is not None:
+            print(f"LLM stats ({self.prompt_mode} prompt mode): {self.matcher.stats.summary()}")
+        return self.stats
+
+
+def run_pipeline(company_name: CompanyScrapers, **kwargs) -> PipelineStats:
+    """Scrape and filter one company as a stream; see StreamingPipeline"""
+    return StreamingPipeline(company_name, **kwargs).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape and filter job postings as a stream")
+    parser.add_argument("company", help="company to scrape, e.g. meta")
+    parser.add_argument("--force-refresh", action="store_true")
+    parser.add_argument(
+        "--no-ai", action="store_true", help="stop after the text filter"
+    )
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    start_metrics(args)
+
+    stats = run_pipeline(
+        CompanyScrapers(args.company.lower()),
+        resume_text=None if args.no_ai else Resume().resume_text,
+        force_refresh=args.force_refresh,
+    )
+    print(stats.summary())
+    finish_metrics(args)
@@ -1,11 +1,29 @@
-from typing import List, Dict, Type, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Dict, Set, Type, Optional, Tuple
 from src.models.job import JobPosting
-from src.storage.jobs_db import JobsDatabase
+from src.scrapers.base_scraper import ListingPage
+from src.storage.jobs_db import DEFAULT_DB_PATH, JobsDatabase
 from src.scrapers.meta import MetaScraper
 from src.scrapers.microsoft import MicrosoftScraper
 from src.models.company import CompanyScrapers
-import re
-import requests
+from src.scrapers.http_archive import HttpArchive, RECORD, REPLAY
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.http_client import HttpClient
+from src.filters.qualifications import QualificationFilter
+from src.filters.embeddings import EmbeddingRanker
+from src.monitoring.metrics import METRICS, add_metrics_arguments, finish_metrics, start_metrics
+from src.monitoring.profiling import DEFAULT_PROFILE_DIR, profile_run
+from src.filters.ai_matcher import (
+    AIMatcher,
+    AIVerdict,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_PROMPT_MODE,
+    OllamaClient,
+)
+import argparse
+import time
+from pathlib import Path
 from src.models.resume import Resume
 
 # Define a mapping of company names to scraper classes
@@ -16,145 +34,379 @@ COMPANY_SCRAPER_MAP: Dict[CompanyScrapers, Type] = {
     # CompanyScrapers.AMAZON: AmazonScraper,
 }
 
-
-def get_scraper_for_company(company_name: CompanyScrapers):
+# Number of detail pages fetched concurrently per company. Every worker shares
+# the scraper's HttpClient, so its rotation and rate limiting still apply.
+DEFAULT_DETAIL_WORKERS = 4
+DETAIL_WORKERS_MAP: Dict[CompanyScrapers, int] = {
+    CompanyScrapers.META: 4,
+    CompanyScrapers.MICROSOFT: 8,
+}
+# Listing pages fetched concurrently once the result count is known
+LISTING_PREFETCH_WORKERS = 4
+# Scraped jobs and AI verdicts are written to the database in batches of this size
+DETAIL_FLUSH_SIZE = 50
+AI_MATCH_FLUSH_SIZE = 10
+# Cached LLM verdicts unused for this long, or beyond this count, are evicted
+VERDICT_CACHE_MAX_AGE_DAYS = 30
+VERDICT_CACHE_MAX_ENTRIES = 50000
+# Only the EMBEDDING_TOP_K text-matched jobs most similar to the resume (and,
+# if set, scoring at least EMBEDDING_MIN_SCORE) are sent to the LLM
+EMBEDDING_TOP_K = 50
+EMBEDDING_MIN_SCORE = None
+# ai_match_reason prefix of text-matched jobs the pre-rank kept from the LLM.
+# They get ai_match = FALSE and no score, replacing any verdict from an
+# earlier run, so they can't be mistaken for jobs the LLM rejected or hasn't seen.
+RANKED_OUT_REASON = "Ranked out by embedding pre-rank"
+# The only job columns the text and AI filters read
+FILTER_COLUMNS = ("id", "company", "title", "requirements", "extra_qualifications")
+
+
+@dataclass
+class ScrapeStats:
+    """Per-company counters collected during a scrape run"""
+
+    company: str
+    pages: int = 0
+    listings: int = 0
+    jobs_changed: int = 0
+    jobs_stored: int = 0
+    jobs_failed: int = 0
+    bytes_received: int = 0
+    startup_time: float = 0.0
+    wall_time: float = 0.0
+    error: Optional[str] = None
+
+
+def get_scraper_for_company(
+    company_name: CompanyScrapers, http_client: Optional[HttpClient] = None
+):
     try:
         scraper_class = COMPANY_SCRAPER_MAP[company_name]
-        return scraper_class()
+        return scraper_class(http_client)
     except KeyError:
         raise ValueError(f"Scraper not implemented for company: {company_name}")
 
 
-def scrape_jobs_for_company(company_name: CompanyScrapers, force_refresh: bool = False):
+def iter_job_details(
+    scraper,
+    jobs: Iterable[JobPosting],
+    max_workers: int = DEFAULT_DETAIL_WORKERS,
+    revalidate_ids: Set[str] = frozenset(),
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Iterator[Tuple[JobPosting, Optional[JobPosting], Optional[Exception]]]:
+    """
+    Fetch job details with up to max_workers requests in flight. Jobs in
+    revalidate_ids skip a fresh cached detail page and revalidate it instead.
+    Pass an executor to reuse its worker threads across calls; otherwise one
+    is created for this batch.
+
+    Yields (job, job_with_details, error) tuples in completion order. A failed
+    job yields its exception instead of raising, so one bad posting does not
+    abort the rest of the batch.
+    """
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            yield from iter_job_details(scraper, jobs, max_workers, revalidate_ids, executor)
+        return
+
+    futures = {
+        executor.submit(
+            scraper.get_job_with_details, job, revalidate=job.id in revalidate_ids
+        ): job
+        for job in jobs
+    }
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            yield job, future.result(), None
+        except Exception as e:
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            yield job, None, e
+
+
+def iter_listing_pages(
+    scraper, max_workers: int = LISTING_PREFETCH_WORKERS
+) -> Iterator[ListingPage]:
+    """
+    Yield a company's listing pages in order, fetching ahead of the caller.
+
+    When the first page reports the total result count, every remaining page
+    is requested up front on max_workers threads. Otherwise page N+1 is
+    fetched while the caller works on page N. Iteration stops after a page
+    marked is_last; a caller that stops early (e.g. on a page with no new ids)
+    cancels the requests that have not started.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        first_page = scraper.get_listing_page(page=1)
+        yield first_page
+        if first_page.is_last:
+            return
+
+        if first_page.page_count:
+            futures = [
+                executor.submit(scraper.get_listing_page, page=page)
+                for page in range(2, first_page.page_count + 1)
+            ]
+            for future in futures:
+                listing_page = future.result()
+                yield listing_page
+                if listing_page.is_last:
+                    return
+            return
+
+        page = 2
+        future = executor.submit(scraper.get_listing_page, page=page)
+        while True:
+            listing_page = future.result()
+            if listing_page.is_last:
+                yield listing_page
+                return
+            page += 1
+            future = executor.submit(scraper.get_listing_page, page=page)
+            yield listing_page
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def partition_listings(
+    job_listings: Iterable[JobPosting], known_hashes: Dict[str, Optional[str]]
+) -> Tuple[List[JobPosting], List[JobPosting], Dict[str, str]]:
+    """
+    Hash each listing and split them into new jobs, stored jobs whose hash
+    changed, and stored jobs scraped before hashing ({id: hash}), which only
+    need their hash recorded rather than re-enrichment.
+    """
+    new_jobs, changed_jobs, unhashed = [], [], {}
+    for job in job_listings:
+        # Carried onto the enriched posting by merge()
+        job.content_hash = job.listing_hash()
+        if job.id not in known_hashes:
+            new_jobs.append(job)
+        elif known_hashes[job.id] is None:
+            unhashed[job.id] = job.content_hash
+        elif known_hashes[job.id] != job.content_hash:
+            changed_jobs.append(job)
+    return new_jobs, changed_jobs, unhashed
+
+
+def scrape_jobs_for_company(
+    company_name: CompanyScrapers,
+    force_refresh: bool = False,
+    max_workers: Optional[int] = None,
+    stats: Optional[ScrapeStats] = None,
+    http_client: Optional[HttpClient] = None,
+    db: Optional[JobsDatabase] = None,
+):
+    """
+    Page through a company's listings and store every new posting with its
+    details. Postings already stored are only re-enriched when their listing
+    hash changed; their cached detail pages are revalidated and the rows are
+    updated in place.
+
+    By default detail pages go through the on-disk HTTP cache. force_refresh
+    re-enriches every listing regardless of its hash, but revalidates cached
+    pages instead of downloading them again, so unchanged postings cost a 304.
+
+    Pass an http_client built on an HttpArchive to record the run, or to
+    replay a recorded one without the network.
+    """
+    if db is None:
+        with JobsDatabase() as db:
+            return scrape_jobs_for_company(
+                company_name, force_refresh, max_workers, stats, http_client, db
+            )
+
+    if stats is None:
+        stats = ScrapeStats(company=company_name.value)
+    start_time = time.perf_counter()
+    if max_workers is None:
+        max_workers = DETAIL_WORKERS_MAP.get(company_name, DEFAULT_DETAIL_WORKERS)
+
     # pagination:
-    db = JobsDatabase()
     jobs = set()
-    page = 1
     processed_jobs = []
     print("Scraping jobs for company:", company_name.value, "with pagination")
-    while True:
-        prev_size = len(jobs)
-        scraper = get_scraper_for_company(company_name)
-        job_listings = scraper.get_job_listings(page=page)
-        jobs.update(job.id for job in job_listings)
-        if len(jobs) > prev_size:
-            page += 1
-        else:
-            break
-
-        if force_refresh:
-            jobs_to_process = job_listings
-            print(f"Force refreshing all {len(job_listings)} jobs")
-        else:
-            existing_ids = set(job.id for job in db.get_jobs(company_name))
-            jobs_to_process = [
-                job for job in job_listings if job.id not in existing_ids
-            ]
-            print(
-                f"Found {len(jobs_to_process)} new jobs out of {len(job_listings)} total listings"
-            )
 
-        for _, job in enumerate(jobs_to_process):
-            print(f"Processing job {job.id}")
-            job_with_details = scraper.get_job_with_details(job)
-            if job_with_details:
-                processed_jobs.append(job_with_details)
-                db.store_job(job_with_details, company_name)
+    # id -> content_hash, loaded once and kept current as jobs are stored, so
+    # each page is diffed against it in O(page) instead of reloading the table
+    known_hashes = db.get_job_hashes(company_name)
+
+    # One scraper (one Tor controller, one pool of sessions) for the whole run
+    startup_start = time.perf_counter()
+    if http_client is None:
+        http_client = HttpClient(cache=HttpCache(revalidate=force_refresh))
+    scraper = get_scraper_for_company(company_name, http_client)
+    stats.startup_time = time.perf_counter() - startup_start
+
+    # One set of detail workers for every page of the run
+    detail_executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    with scraper, detail_executor, db.batch_writer(flush_size=DETAIL_FLUSH_SIZE) as writer:
+        # Later pages are fetched while this loop enriches the current one
+        for listing_page in iter_listing_pages(scraper):
+            job_listings = listing_page.jobs
+            prev_size = len(jobs)
+            stats.pages += 1
+            jobs.update(job.id for job in job_listings)
+            # A page with no unseen ids means the site is repeating itself
+            if len(jobs) == prev_size:
+                break
+            stats.listings += len(job_listings)
+
+            new_jobs, changed_jobs, unhashed = partition_listings(
+                job_listings, known_hashes
+            )
+            if unhashed:
+                db.update_content_hashes(company_name, unhashed)
+                known_hashes.update(unhashed)
+            stats.jobs_changed += len(changed_jobs)
+
+            if force_refresh:
+                jobs_to_process = job_listings
+                print(f"Force refreshing all {len(job_listings)} jobs")
+            else:
+                jobs_to_process = new_jobs + changed_jobs
+                print(
+                    f"Found {len(new_jobs)} new and {len(changed_jobs)} changed jobs "
+                    f"out of {len(job_listings)} total listings"
+                )
 
+            failed = 0
+            # A changed listing must not be enriched from a detail page cached
+            # before the change, or its new hash would be stored with old details
+            changed_ids = {job.id for job in changed_jobs}
+            for job, job_with_details, error in iter_job_details(
+                scraper,
+                jobs_to_process,
+                max_workers,
+                revalidate_ids=changed_ids,
+                executor=detail_executor,
+            ):
+                if error:
+                    failed += 1
+                    print(f"Error processing job {job.id}: {error}")
+                elif job_with_details is None:
+                    # The scraper already reported why the page had no details
+                    failed += 1
+                    print(f"No details for job {job.id}")
+                else:
+                    print(f"Processed job {job.id}")
+                    processed_jobs.append(job_with_details)
+                    writer.add_job(job_with_details, company_name)
+                    known_hashes[job.id] = job.content_hash
+            if failed:
+                print(f"Failed to fetch details for {failed} jobs on this page")
+            stats.jobs_failed += failed
+
+        stats.bytes_received = scraper.http_client.bytes_received
+        if scraper.http_client.cache is not None:
+            print(f"HTTP cache: {scraper.http_client.cache.summary()}")
+        print(f"Rate limiter: {scraper.http_client.rate_limiter.summary()}")
+
+    stats.jobs_stored = len(processed_jobs)
+    stats.wall_time = time.perf_counter() - start_time
     return processed_jobs
 
 
-def filter_jobs_by_qualifications_text_based(
-    jobs: List[JobPosting],
-) -> List[JobPosting]:
+def scrape_all_companies(
+    companies: Optional[List[CompanyScrapers]] = None,
+    force_refresh: bool = False,
+    db_path: str = DEFAULT_DB_PATH,
+) -> List[ScrapeStats]:
     """
-    Filter jobs to only include entry-level positions based on qualifications.
-
-    Args:
-        jobs: List of JobPosting objects to filter
-
-    Returns:
-        List[JobPosting]: Filtered list containing only entry-level positions
+    Scrape every company in COMPANY_SCRAPER_MAP concurrently, one worker per
+    company. Each worker builds its own scraper (and therefore its own
+    HttpClient and rate budget) and writes to the database as it goes, so the
+    total runtime is that of the slowest company rather than the sum.
     """
-    years_pattern = re.compile(
-        r"(?:([2-9]|\d{2,})(?:\s*[-+]?\s*(?:years?|yrs?|y)|(?:[^\w\d]{1,5})(?:years?|yrs?|yr)))"
-        r"|"
-        r"(?:(two|three|four|five|six|seven|eight|nine|ten)(?:\+|&#43;)?\s*(?:&nbsp;|\s)*(?:year|yr)s?)"
-    )
+    companies = companies or list(COMPANY_SCRAPER_MAP)
+    all_stats = {company: ScrapeStats(company=company.value) for company in companies}
 
-    includes_grad = re.compile(
-        r"(?:M\.S\.?|Ph\.?\s?D\.?|PhD|[Mm]aster(?:[\\u0027]|\')?s|[Dd]octorate)(?:\s|\(|\)|$)"
-    )
-    includes_bachelors = re.compile(
-        r"(BA|BS|Bachelor(?:[\\u0027]|\')?s?|BACHELOR|B\.S\.?)"
-    )
+    def run(company: CompanyScrapers):
+        stats = all_stats[company]
+        start_time = time.perf_counter()
+        try:
+            with JobsDatabase(db_path) as db:
+                scrape_jobs_for_company(
+                    company, force_refresh=force_refresh, stats=stats, db=db
+                )
+        except Exception as e:
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            stats.error = str(e)
+            stats.wall_time = time.perf_counter() - start_time
+            print(f"Error scraping {company.value}: {e}")
 
-    leadership_pattern = re.compile(
-        r"(?:[Ll]ead(?:er|ership)?|[Mm]anager(?:ial)?|[Dd]irect(?:or|ing))"
-    )
+    with ThreadPoolExecutor(max_workers=len(companies)) as executor:
+        list(executor.map(run, companies))
 
-    research_pattern = re.compile(r"(?:[Rr]esearch|[Dd]ata\s+[Ss]cientist)")
+    print_scrape_summary(list(all_stats.values()))
+    return list(all_stats.values())
 
-    def is_entry_level(job: JobPosting, strict: bool = False) -> bool:
-        # Combine all relevant text fields for checking
-        if strict:
-            qualifications = " ".join(job.extra_qualifications).lower()
-        else:
-            qualifications = " ".join(job.extra_qualifications).lower()
 
-        title = job.title
+def print_scrape_summary(all_stats: List[ScrapeStats]):
+    print(
+        f"{'company':<12}{'pages':>7}{'listings':>10}{'changed':>9}{'stored':>8}"
+        f"{'failed':>8}{'KiB':>10}{'startup':>9}{'seconds':>9}"
+    )
+    for stats in all_stats:
         print(
-            f"DEBUG: Title: {title}, posting_url: https://jobs.careers.microsoft.com/global/en/job/{job.id}"
+            f"{stats.company:<12}{stats.pages:>7}{stats.listings:>10}{stats.jobs_changed:>9}"
+            f"{stats.jobs_stored:>8}{stats.jobs_failed:>8}"
+            f"{stats.bytes_received / 1024:>10.1f}{stats.startup_time:>9.2f}"
+            f"{stats.wall_time:>9.1f}"
+            + (f"  ERROR: {stats.error}" if stats.error else "")
         )
 
-        for qualification in job.extra_qualifications:
-            # Check for graduate degree in title first
-            if includes_grad.search(title):
-                print(f"DEBUG: Filtered out: Graduate degree found in title")
-                return False
 
-            title = title.lower()
+def replay_db_path(archive_path: str) -> Path:
+    """Scratch database next to an archive, so a replay never touches data/jobs.db"""
+    archive = Path(archive_path)
+    return archive.parent / f"{archive.name.split('.')[0]}.replay.db"
 
-            # Check for years of experience
-            if years_pattern.search(qualification):
-                print(f"DEBUG: Filtered out: Years of experience found")
-                return False
 
-            # Check for graduate degree requirements
-            if strict and includes_grad.search(qualification):
-                print(
-                    f"DEBUG: Filtered out: Strict mode - Graduate degree requirements found"
-                )
-                return False
-
-            if (
-                not strict
-                and includes_grad.search(qualification)
-                and not includes_bachelors.search(qualification)
-            ):
-                print(
-                    f"DEBUG: Filtered out: Non-strict mode - Graduate degree only requirements found"
-                )
-                return False
-
-            if strict and research_pattern.search(title):
-                print(f"DEBUG: Filtered out: Research role found")
-                return False
-
-            # Check for leadership requirements
-            if leadership_pattern.search(title):
-                print(f"DEBUG: Filtered out: Leadership role found")
-                return False
+def filter_jobs_by_qualifications_text_based(
+    jobs: Iterable[JobPosting], strict: bool = False
+) -> List[JobPosting]:
+    """
+    Filter jobs to only include entry-level positions based on qualifications.
 
-        print(f"DEBUG: Filtered in: {qualifications}")
-        return True
+    Args:
+        jobs: JobPosting objects to filter
+        strict: Also reject any graduate degree mention and research roles
 
-    # return [job for job in jobs if is_entry_level(job)]
-    return [job for job in jobs if is_entry_level(job, strict=False)]
+    Returns:
+        List[JobPosting]: Filtered list containing only entry-level positions
+    """
+    with METRICS.timer("filter_seconds", filter="text"):
+        results = list(QualificationFilter(strict=strict).results(jobs))
+    passed = [result.job for result in results if result.passed]
+    METRICS.inc("filter_jobs_total", len(passed), filter="text", result="passed")
+    METRICS.inc("filter_jobs_total", len(results) - len(passed), filter="text", result="rejected")
+    return passed
+
+
+def record_verdict(verdict: AIVerdict):
+    """Count an LLM verdict in the filter metrics"""
+    result = "error" if verdict.error else "match" if verdict.is_match else "rejected"
+    METRICS.inc("filter_jobs_total", filter="ai", result=result)
+    METRICS.inc("llm_verdicts_total", result=result, cached=str(verdict.cached).lower())
+    if not verdict.error:
+        METRICS.event(
+            "ai_verdict", job_id=verdict.job.id, match=verdict.is_match,
+            score=verdict.score, cached=verdict.cached,
+        )
 
 
 def filter_jobs_by_qualifications_ai_based(
-    jobs: List[JobPosting], resume_text: Optional[str] = None
+    jobs: List[JobPosting],
+    resume_text: Optional[str] = None,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    client: Optional[OllamaClient] = None,
+    db: Optional[JobsDatabase] = None,
+    prompt_mode: str = DEFAULT_PROMPT_MODE,
+    structured: bool = True,
 ) -> List[JobPosting]:
     """
     OLLAMA must be running locally to use this function.
@@ -172,76 +424,118 @@ def filter_jobs_by_qualifications_ai_based(
     Args:
         jobs: List of JobPosting objects to filter
         resume_text: Optional text content of the user's resume
+        max_in_flight: Number of prompts sent to Ollama concurrently
+        client: OllamaClient to use instead of one for localhost
+        db: Database the verdicts are written to
+        prompt_mode: How the resume prefix is sent, one of PROMPT_MODES
+        structured: Ask for a JSON verdict with a typed match flag and score
+            instead of searching free text for "YES"
 
     Returns:
         List[JobPosting]: Filtered list containing suitable positions
     """
     if not resume_text:
         return []
+    if db is None:
+        with JobsDatabase() as db:
+            return filter_jobs_by_qualifications_ai_based(
+                jobs, resume_text, max_in_flight, client, db, prompt_mode, structured
+            )
 
-    OLLAMA_ENDPOINT = "http://localhost:11434/api/generate"
-    db = JobsDatabase()
     matching_jobs = []
 
-    for job in jobs:
-        # Combine job details into a comprehensive description
-        if job.requirements:
-            requirements = " ".join(job.requirements)
-        else:
-            requirements = "Just use the qualifications"
-        job_description = f"""
-        Title: {job.title}
-        Requirements: {requirements}
-        Qualifications: {" ".join(job.extra_qualifications)}
-        """
-
-        # Construct the prompt for the LLM
-        prompt = f"""
-        Task: Analyze if the following job posting is suitable for an entry-level candidate
-        and a good match for the candidate's resume. Consider:
-        1. Do you think he has a good chance of being the most competitive candidate for this job?
-        2. Special emphasis that this does not expect a graduate degree and the work is computer programming.
-
-        Job Details:
-        {job_description}
-
-        Qualifications:
-        {job.extra_qualifications}
-
-        Candidate's Resume:
-        {resume_text}
-
-        Make sure your answer includes "YES" if this is a good match for an entry-level candidate with this resume,
-        and "NO" if it's not suitable. Limit yourself to 3 lines of text. Must be under 200 characters.
-        """
-
-        try:
-            response = requests.post(
-                OLLAMA_ENDPOINT,
-                json={"model": "mistral", "prompt": prompt, "stream": False},
+    cached = 0
+    filter_start = time.perf_counter()
+    with AIMatcher(
+        resume_text,
+        client=client,
+        max_in_flight=max_in_flight,
+        cache=db,
+        prompt_mode=prompt_mode,
+        structured=structured,
+    ) as matcher, db.batch_writer(flush_size=AI_MATCH_FLUSH_SIZE) as writer:
+        for verdict in matcher.iter_verdicts(jobs):
+            job = verdict.job
+            record_verdict(verdict)
+            if verdict.error:
+                print(f"Error processing job {job.id}: {verdict.error}")
+                continue
+            if verdict.cached:
+                cached += 1
+            else:
+                print(f"OLLAMA RESPONSE FOR JOB {job.id}: {verdict.answer}")
+            writer.add_ai_match(
+                CompanyScrapers(job.company),
+                job.id,
+                verdict.is_match,
+                verdict.answer,
+                verdict.score,
             )
-            if response.status_code == 200:
-                result = response.json()
-                answer = result["response"].strip()
-                print(f"OLLAMA RESPONSE FOR JOB {job.id}: {answer}")
-                is_match = "YES" in answer.upper()
-                # Update the database immediately for each job
-                db.update_job_ai_match(
-                    CompanyScrapers(job.company), job.id, is_match, answer
-                )
-                if is_match:
-                    matching_jobs.append(job)
-
-        except Exception as e:
-            print(f"Error processing job {job.id}: {str(e)}")
-            continue
+            if verdict.is_match:
+                matching_jobs.append(job)
 
+    METRICS.observe("filter_seconds", time.perf_counter() - filter_start, filter="ai")
+    evicted = db.evict_cached_verdicts(
+        max_entries=VERDICT_CACHE_MAX_ENTRIES, max_age_days=VERDICT_CACHE_MAX_AGE_DAYS
+    )
+    print(f"Reused {cached} cached verdicts, evicted {evicted} stale ones")
+    print(f"LLM stats ({prompt_mode} prompt mode): {matcher.stats.summary()}")
     return matching_jobs
 
 
-def store_filtered_jobs_for_company(company_name: CompanyScrapers):
-    db = JobsDatabase()
-    jobs = db.get_jobs(company_name)
+def prerank_jobs_by_embeddings(
+    jobs: List[JobPosting],
+    resume_text: str,
+    db: JobsDatabase,
+    top_k: Optional[int] = EMBEDDING_TOP_K,
+    min_score: Optional[float] = EMBEDDING_MIN_SCORE,
+    client: Optional[OllamaClient] = None,
+) -> List[JobPosting]:
+    """
+    Narrow text-matched jobs down to the ones most similar to the resume
+    before the LLM sees them. Jobs left out are stored as non-matches with a
+    RANKED_OUT_REASON reason. If the embedding model is unavailable every job
+    is passed through unchanged.
+    """
+    ranker = EmbeddingRanker(
+        resume_text, db, client=client, top_k=top_k, min_score=min_score
+    )
+    try:
+        selected, ranked_out = ranker.partition(jobs)
+    except Exception as e:
+        if isinstance(e, KeyboardInterrupt):
+            raise
+        print(f"Embedding pre-rank unavailable, sending every job to the LLM: {e}")
+        return jobs
+    finally:
+        # A client passed in by the caller is theirs to close
+        if client is None:
+            ranker.client.close()
+    db.update_ai_matches(
+        (
+            CompanyScrapers(job.company),
+            job.id,
+            False,
+            f"{RANKED_OUT_REASON}: similarity {score:.3f}, rank {rank} of {len(jobs)}",
+            None,
+        )
+        for job, score, rank in ranked_out
+    )
+    print(f"Embedding pre-rank kept {len(selected)} of {len(jobs)} jobs")
+    return selected
+
+
+def store_filtered_jobs_for_company(
+    company_name: CompanyScrapers,
+    prerank: bool = True,
+    db: Optional[JobsDatabase] = None,
+    top_k: Optional[int] = EMBEDDING_TOP_K,
+):
+    if db is None:
+        with JobsDatabase() as db:
+            return store_filtered_jobs_for_company(company_name, prerank, db, top_k)
+
+    jobs = list(db.iter_jobs(company_name, columns=FILTER_COLUMNS))
     filtered_jobs_text = filter_jobs_by_qualifications_text_based(jobs)
     print(
         f"Found {len(filtered_jobs_text)} matching jobs out of {len(jobs)} total jobs"
@@ -251,18 +545,112 @@ def store_filtered_jobs_for_company(company_name: CompanyScrapers):
     # Update text_match status in database
     db.update_text_matches(company_name, [job.id for job in filtered_jobs_text])
 
+    resume_text = Resume().resume_text
+    candidates = filtered_jobs_text
+    if prerank:
+        candidates = prerank_jobs_by_embeddings(filtered_jobs_text, resume_text, db, top_k=top_k)
+
     print("\n\n AI FILTERED JOBS \n\n this may take a while to run ...")
-    filter_jobs_by_qualifications_ai_based(filtered_jobs_text, Resume().resume_text)
+    filter_jobs_by_qualifications_ai_based(candidates, resume_text, db=db)
     print(
         f"Found {len(filtered_jobs_text)} matching jobs out of {len(jobs)} total jobs"
     )
 
 
 if __name__ == "__main__":
-    company_name = input("Company name: ")
-    company = CompanyScrapers(company_name.lower())
-    scrape_jobs_for_company(company, force_refresh=False)
-    store_filtered_jobs_for_company(company)
+    parser = argparse.ArgumentParser(description="Scrape and filter job postings")
+    parser.add_argument("company", nargs="?", help="company to scrape, e.g. meta")
+    parser.add_argument(
+        "--all", action="store_true", help="scrape every supported company concurrently"
+    )
+    parser.add_argument("--force-refresh", action="store_true")
+    parser.add_argument(
+        "--no-prerank",
+        action="store_true",
+        help="send every text-matched job to the LLM instead of the top embedding matches",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=EMBEDDING_TOP_K,
+        metavar="K",
+        help=f"text-matched jobs most similar to the resume that go to the LLM (default: "
+        f"{EMBEDDING_TOP_K}); the rest are stored with ai_match false and an "
+        f"ai_match_reason starting '{RANKED_OUT_REASON}'",
+    )
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record", metavar="ARCHIVE", help="save every HTTP response to ARCHIVE (.jsonl.gz)"
+    )
+    archive_group.add_argument(
+        "--replay", metavar="ARCHIVE", help="answer HTTP requests from ARCHIVE, offline"
+    )
+    parser.add_argument(
+        "--db",
+        metavar="PATH",
+        help=f"jobs database to read and write (default: {DEFAULT_DB_PATH}; with --replay, "
+        "a fresh scratch database next to the archive)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_PROFILE_DIR,
+        metavar="DIR",
+        help=f"run under cProfile and write a hot-function report and collapsed stacks to DIR "
+        f"(default: {DEFAULT_PROFILE_DIR})",
+    )
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.all and (args.record or args.replay):
+        parser.error("--record and --replay take a single company")
+    start_metrics(args)
+
+    db_path = args.db or DEFAULT_DB_PATH
+    if args.replay and not args.db:
+        # Start from an empty database so every replay enriches the same jobs
+        db_path = replay_db_path(args.replay)
+        for stale in (db_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+            stale.unlink(missing_ok=True)
+        print(f"Replaying into scratch database {db_path}")
+
+    if args.all:
+        profile_name = "all"
+
+        def run():
+            stats_list = scrape_all_companies(force_refresh=args.force_refresh, db_path=db_path)
+            for stats in stats_list:
+                if not stats.error:
+                    with JobsDatabase(db_path) as db:
+                        store_filtered_jobs_for_company(
+                            CompanyScrapers(stats.company),
+                            prerank=not args.no_prerank,
+                            db=db,
+                            top_k=args.top_k,
+                        )
+    else:
+        company_name = args.company or input("Company name: ")
+        company = CompanyScrapers(company_name.lower())
+        profile_name = company.value
+        http_client = None
+        if args.record:
+            http_client = HttpClient(archive=HttpArchive(args.record, mode=RECORD))
+        elif args.replay:
+            http_client = HttpClient(archive=HttpArchive(args.replay, mode=REPLAY))
+
+        def run():
+            with JobsDatabase(db_path) as db:
+                scrape_jobs_for_company(
+                    company, force_refresh=args.force_refresh, http_client=http_client, db=db
+                )
+                store_filtered_jobs_for_company(
+                    company, prerank=not args.no_prerank, db=db, top_k=args.top_k
+                )
+
+    if args.profile:
+        profile_run(run, profile_name, args.profile)
+    else:
+        run()
+    finish_metrics(args)
 
     # scrape_jobs_for_company(CompanyScrapers.MICROSOFT, force_refresh=True)
     # store_filtered_jobs_for_company(CompanyScrapers.MICROSOFT)
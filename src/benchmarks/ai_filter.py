@@ -0,0 +1,53 @@
+"""
+Benchmark the AI filter against the stub Ollama server with different numbers
+of prompts in flight.
+
+Run from the repository root:
+    python -m src.benchmarks.ai_filter --jobs 40 --latency 0.2
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.actions.scrape_jobs import filter_jobs_by_qualifications_ai_based
+from src.benchmarks.db_writes import synthetic_jobs
+from src.benchmarks.ollama_stub import generate_handler
+from src.benchmarks.stub_server import StubServer
+from src.filters.ai_matcher import OllamaClient
+from src.models.company import CompanyScrapers
+from src.models.resume import Resume
+from src.storage.jobs_db import JobsDatabase
+
+
+def run(jobs: int, latency: float, in_flight: int) -> float:
+    postings = synthetic_jobs(jobs)
+    with tempfile.TemporaryDirectory() as tmp, StubServer(
+        generate_handler, latency=latency
+    ) as server:
+        db = JobsDatabase(str(Path(tmp) / "jobs.db"))
+        db.store_jobs(postings, CompanyScrapers.MICROSOFT)
+        client = OllamaClient(base_url=server.url, pool_size=in_flight)
+        start = time.perf_counter()
+        matches = filter_jobs_by_qualifications_ai_based(
+            postings, Resume().resume_text, max_in_flight=in_flight, client=client, db=db
+        )
+        elapsed = time.perf_counter() - start
+        db.close()
+    return elapsed, len(matches)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    results = [(n, *run(args.jobs, args.latency, n)) for n in args.in_flight]
+    print()
+    for in_flight, elapsed, matches in results:
+        print(
+            f"in_flight={in_flight:>2}  {elapsed:6.2f}s  "
+            f"{args.jobs / elapsed:6.1f} jobs/s  ({matches} matches)"
+        )
@@ -0,0 +1,75 @@
+"""
+Benchmark per-row JobsDatabase.store_job against the batched store_jobs path.
+
+Run from the repository root:
+    python -m src.benchmarks.db_writes --rows 50000
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from src.models.company import CompanyScrapers
+from src.models.job import JobPosting
+from src.storage.jobs_db import DEFAULT_FLUSH_SIZE, JobsDatabase
+
+
+def synthetic_jobs(count: int) -> List[JobPosting]:
+    return [
+        JobPosting(
+            company="microsoft",
+            title=f"Software Engineer {i}",
+            id=str(i),
+            location="Redmond, Washington, United States",
+            locations=["Redmond, Washington, United States"],
+            posting_url=f"https://jobs.careers.microsoft.com/global/en/job/{i}",
+            posted_date=datetime(2025, 2, 1),
+            description="Build and ship services used by millions of customers. " * 5,
+            responsibilities=["Design, implement and test features"] * 3,
+            extra_qualifications=[
+                "Bachelor's Degree in Computer Science or related technical field",
+                "Experience coding in C, C++, C#, Java, JavaScript, or Python",
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def run(rows: int, per_row_rows: int, flush_size: int):
+    jobs = synthetic_jobs(rows)
+    company = CompanyScrapers.MICROSOFT
+    with tempfile.TemporaryDirectory() as tmp:
+        db = JobsDatabase(str(Path(tmp) / "per_row.db"))
+        start = time.perf_counter()
+        for job in jobs[:per_row_rows]:
+            db.store_job(job, company)
+        per_row = time.perf_counter() - start
+        print(
+            f"store_job   {per_row_rows:>7} rows  {per_row:8.2f}s  "
+            f"{per_row_rows / per_row:10.0f} rows/s"
+        )
+
+        db = JobsDatabase(str(Path(tmp) / "batched.db"))
+        start = time.perf_counter()
+        db.store_jobs(jobs, company, flush_size=flush_size)
+        batched = time.perf_counter() - start
+        db.close()
+        print(f"store_jobs  {rows:>7} rows  {batched:8.2f}s  {rows / batched:10.0f} rows/s")
+
+    speedup = (rows / batched) / (per_row_rows / per_row)
+    print(f"batched throughput is {speedup:.0f}x the per-row path")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument(
+        "--per-row-rows",
+        type=int,
+        help="rows written through store_job (defaults to --rows; lower it on slow disks)",
+    )
+    parser.add_argument("--flush-size", type=int, default=DEFAULT_FLUSH_SIZE)
+    args = parser.parse_args()
+    run(args.rows, args.per_row_rows or args.rows, args.flush_size)
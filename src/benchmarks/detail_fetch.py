@@ -0,0 +1,91 @@
+"""
+Benchmark serial vs concurrent detail fetching through HttpClient against a
+local stub server.
+
+Run from the repository root:
+    python -m src.benchmarks.detail_fetch --jobs 200 --latency 0.05
+    python -m src.benchmarks.detail_fetch --jobs 100 --rate 20
+"""
+import argparse
+import json
+import time
+from typing import List, Optional
+
+from src.actions.scrape_jobs import iter_job_details
+from src.benchmarks.stub_server import StubServer
+from src.models.job import JobPosting
+from src.scrapers.base_scraper import BaseScraper
+from src.scrapers.http_client import HttpClient
+from src.scrapers.rate_limiter import RateLimiter
+
+
+def _detail_handler(method: str, path: str, body: bytes):
+    job_id = path.rstrip("/").rsplit("/", 1)[-1]
+    if job_id.endswith("7"):
+        return 500, "text/plain", b"stub failure"
+    payload = {"id": job_id, "qualifications": "BS in Computer Science;Python"}
+    return 200, "application/json", json.dumps(payload).encode()
+
+
+class StubScraper(BaseScraper):
+    """
+    Scraper that fetches detail pages from the stub server through an
+    HttpClient, so its session pool and rate limiter are part of the run
+    """
+
+    def __init__(self, http_client: HttpClient, base_url: str):
+        self.http_client = http_client
+        self.base_url = base_url
+
+    def get_job_listings(self, page: int = 1) -> List[JobPosting]:
+        return []
+
+    def get_job_with_details(self, job: JobPosting, revalidate: bool = False) -> Optional[JobPosting]:
+        response = self.http_client.get(
+            f"{self.base_url}/jobs/{job.id}", cacheable=True, revalidate=revalidate
+        )
+        if not response.ok:
+            # Like the company scrapers, a failed page yields no details
+            return None
+        job.extra_qualifications = response.json()["qualifications"].split(";")
+        return job
+
+
+def run(jobs: int, latency: float, workers: int, rate: float) -> float:
+    # A fixed rate: max_rate stops slow start from raising it mid-run
+    rate_limiter = RateLimiter(initial_rate=rate, max_rate=rate, burst=workers)
+    http_client = HttpClient(use_tor=False, rate_limiter=rate_limiter)
+    with StubServer(_detail_handler, latency=latency) as server:
+        scraper = StubScraper(http_client, server.url)
+        postings = [JobPosting(company="stub", title="SWE", id=str(i)) for i in range(jobs)]
+        start = time.perf_counter()
+        failed = sum(
+            1 for _, detail, error in iter_job_details(scraper, postings, workers)
+            if error or detail is None
+        )
+        elapsed = time.perf_counter() - start
+        scraper.close()
+    [host_metrics] = rate_limiter.metrics().values()
+    print(
+        f"workers={workers:>3}  {elapsed:7.2f}s  {jobs / elapsed:8.1f} jobs/s  "
+        f"({failed} failed, {host_metrics['waited_seconds']:.1f}s waiting on the rate limit)"
+    )
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument(
+        "--rate", type=float, default=1000.0,
+        help="requests per second the client's rate limiter allows",
+    )
+    args = parser.parse_args()
+
+    baseline = None
+    for workers in args.workers:
+        elapsed = run(args.jobs, args.latency, workers, args.rate)
+        baseline = baseline or elapsed
+        print(f"             speedup vs workers={args.workers[0]}: {baseline / elapsed:.1f}x")
@@ -0,0 +1,63 @@
+"""
+Measure the memory held by 100k JobPostings loaded from SQLite, comparing the
+slotted JobPosting with the previous dict-backed dataclass layout.
+
+Run from the repository root:
+    python -m src.benchmarks.job_memory --rows 100000
+"""
+import argparse
+import gc
+import tempfile
+import tracemalloc
+from dataclasses import field, fields, make_dataclass
+from pathlib import Path
+
+from src.benchmarks.db_writes import synthetic_jobs
+from src.models.company import CompanyScrapers
+from src.models.job import JobPosting
+from src.storage.jobs_db import JOB_COLUMNS, JobsDatabase
+
+# The pre-slots layout: same fields, per-instance __dict__, no interning
+DictJobPosting = make_dataclass(
+    "DictJobPosting",
+    [
+        (f.name, f.type) if f.name in ("company", "title") else (f.name, f.type, field(default=None))
+        for f in fields(JobPosting)
+    ],
+)
+
+
+def measure(db: JobsDatabase, posting_class) -> int:
+    gc.collect()
+    tracemalloc.start()
+    jobs = [
+        posting_class(**{column: getattr(row, column) for column in JOB_COLUMNS})
+        for row in db.iter_jobs()
+    ]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(jobs)
+    del jobs
+    return current // count
+
+
+def run(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = JobsDatabase(str(Path(tmp) / "jobs.db"))
+        db.store_jobs(synthetic_jobs(rows), CompanyScrapers.MICROSOFT)
+        db.close()
+
+        before = measure(db, DictJobPosting)
+        after = measure(db, JobPosting)
+
+    print(f"rows loaded:            {rows}")
+    print(f"dict-backed dataclass:  {before:6d} bytes/posting  {before * rows / 2**20:8.1f} MiB")
+    print(f"slotted JobPosting:     {after:6d} bytes/posting  {after * rows / 2**20:8.1f} MiB")
+    print(f"saved:                  {before - after:6d} bytes/posting  ({1 - after / before:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.rows)
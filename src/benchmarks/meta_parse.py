@@ -0,0 +1,84 @@
+"""
+Benchmark Meta detail-page parsing: full BeautifulSoup parse vs slicing the
+ld+json block out of the raw bytes.
+
+Run from the repository root:
+    python -m src.benchmarks.meta_parse --pages 100
+    python -m src.benchmarks.meta_parse --corpus saved_pages/
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import List
+
+from src.scrapers.meta import extract_ld_json, parse_ld_json_with_soup
+
+
+def synthetic_page(i: int) -> bytes:
+    """A detail page of roughly the size Meta serves: mostly markup and inline scripts"""
+    data = {
+        "@context": "http://schema.org/",
+        "@type": "JobPosting",
+        "id": str(i),
+        "title": f"Software Engineer {i}",
+        "description": "Build and ship infrastructure. " * 40,
+        "responsibilities": ";".join(f"Responsibility {n}" for n in range(12)),
+        "qualifications": ";".join(f"Qualification {n}" for n in range(10)),
+        "preferredQualifications": ";".join(f"Preferred {n}" for n in range(6)),
+        "datePosted": "2025-01-15T00:00:00-08:00",
+        "url": f"https://www.metacareers.com/jobs/{i}/",
+    }
+    filler = "".join(
+        f'<div class="x{n} _a9zs"><span dir="auto">Row {n}</span><a href="/jobs/{n}">link</a></div>'
+        for n in range(500)
+    )
+    inline_script = '<script type="application/json">' + json.dumps({"k": "v" * 5000}) + "</script>"
+    return (
+        "<!DOCTYPE html><html><head><title>Meta Careers</title>"
+        + inline_script
+        + "</head><body>"
+        + filler
+        + '<script type="application/ld+json" nonce="abc">'
+        + json.dumps(data)
+        + "</script>"
+        + filler
+        + "</body></html>"
+    ).encode()
+
+
+def load_pages(corpus: str, count: int) -> List[bytes]:
+    if corpus:
+        pages = [path.read_bytes() for path in sorted(Path(corpus).glob("*.html"))]
+        if pages:
+            return pages
+        print(f"No .html pages in {corpus}, using synthetic pages")
+    return [synthetic_page(i) for i in range(count)]
+
+
+def time_parser(name: str, parse, pages: List[bytes]) -> List:
+    start = time.perf_counter()
+    results = [parse(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12}{elapsed:>8.3f}s  {len(pages) / elapsed:>10,.0f} pages/s")
+    return results
+
+
+def run(corpus: str, count: int):
+    pages = load_pages(corpus, count)
+    size = sum(len(page) for page in pages) / len(pages)
+    print(f"{len(pages)} pages, {size / 1024:.0f} KiB average")
+
+    soup_results = time_parser("soup", lambda page: parse_ld_json_with_soup(page.decode()), pages)
+    fast_results = time_parser("ld+json", extract_ld_json, pages)
+
+    mismatches = sum(1 for a, b in zip(soup_results, fast_results) if a != b)
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--corpus", help="directory of saved detail pages (*.html)")
+    args = parser.parse_args()
+    run(args.corpus, args.pages)
@@ -0,0 +1,82 @@
+"""
+Local stand-in for Ollama's /api/generate and /api/embed endpoints.
+
+Answers every prompt after a fixed latency with the same JSON shape a
+non-streaming Ollama response has. Embeddings are bag-of-words vectors. Run it on Ollama's port to exercise the AI
+filter without a model:
+    python -m src.benchmarks.ollama_stub --port 11434 --latency 0.5
+"""
+import argparse
+import json
+import time
+import zlib
+
+from src.benchmarks.stub_server import StubServer
+
+
+# Size of the stub's bag-of-words embeddings
+EMBEDDING_DIMENSIONS = 64
+
+
+def embed_text(text: str):
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for word in text.lower().split():
+        vector[zlib.crc32(word.encode()) % EMBEDDING_DIMENSIONS] += 1.0
+    return vector
+
+
+def generate_handler(method: str, path: str, body: bytes):
+    if method == "POST" and path.startswith("/api/embed"):
+        request = json.loads(body or b"{}")
+        texts = request.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        response = {"model": request.get("model"), "embeddings": [embed_text(t) for t in texts]}
+        return 200, "application/json", json.dumps(response).encode()
+    if method != "POST" or not path.startswith("/api/generate"):
+        return 404, "application/json", b'{"error": "not found"}'
+    start = time.perf_counter_ns()
+    request = json.loads(body or b"{}")
+    prompt = request.get("prompt", "")
+    # Word counts stand in for tokens. Ollama only reports the tokens it had
+    # to evaluate, so a prompt continued from a context skips the prefix.
+    prompt_tokens = len(prompt.split()) + len(request.get("system", "").split())
+    context = list(request.get("context") or []) + list(range(prompt_tokens))
+    # Deterministic verdict per prompt so repeated runs agree
+    is_match = zlib.crc32(prompt.encode()) % 3 == 0
+    if request.get("format"):
+        score = (zlib.crc32(prompt.encode()) % 100) / 100
+        answer = json.dumps(
+            {"match": is_match, "score": score, "reason": "Stub verdict."}
+        )
+    else:
+        answer = "YES, good entry-level fit." if is_match else "NO, not a fit."
+    response = {
+        "model": request.get("model"),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "response": answer,
+        "done": True,
+        "done_reason": "stop",
+        "context": context,
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_duration": 0,
+        "eval_count": 8,
+        "eval_duration": 0,
+        "load_duration": 0,
+    }
+    response["total_duration"] = time.perf_counter_ns() - start
+    return 200, "application/json", json.dumps(response).encode()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with StubServer(generate_handler, latency=args.latency, port=args.port) as server:
+        print(f"Stub Ollama listening on {server.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,103 @@
+"""
+Compare the staged scrape-then-filter flow with the streaming pipeline on a
+replayed Microsoft archive and the stub Ollama server: total time and how
+soon the first AI verdict is stored.
+
+Run from the repository root:
+    python -m src.benchmarks.pipeline --jobs 300 --latency 0.05 --llm-latency 0.2
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.actions.pipeline import run_pipeline
+from src.actions.scrape_jobs import (
+    FILTER_COLUMNS,
+    filter_jobs_by_qualifications_ai_based,
+    filter_jobs_by_qualifications_text_based,
+    scrape_jobs_for_company,
+)
+from src.benchmarks.ollama_stub import generate_handler
+from src.benchmarks.scrape_replay import record_microsoft
+from src.benchmarks.stub_server import StubServer
+from src.filters.ai_matcher import DEFAULT_MAX_IN_FLIGHT, OllamaClient
+from src.models.company import CompanyScrapers
+from src.models.resume import Resume
+from src.scrapers.http_archive import HttpArchive, RECORD, REPLAY
+from src.scrapers.http_client import HttpClient
+from src.storage.jobs_db import JobsDatabase
+
+COMPANY = CompanyScrapers.MICROSOFT
+
+
+class FirstResponseTimer:
+    """Wraps a stub handler and notes when the first generate response is sent"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.first_at = None
+        self._lock = threading.Lock()
+
+    def __call__(self, method: str, path: str, body: bytes):
+        result = self.handler(method, path, body)
+        if path.startswith("/api/generate"):
+            with self._lock:
+                if self.first_at is None:
+                    self.first_at = time.monotonic()
+        return result
+
+
+def staged(archive: HttpArchive, db: JobsDatabase, client: OllamaClient, resume_text: str):
+    scrape_jobs_for_company(COMPANY, http_client=HttpClient(archive=archive), db=db)
+    jobs = list(db.iter_jobs(COMPANY, columns=FILTER_COLUMNS))
+    filtered = filter_jobs_by_qualifications_text_based(jobs)
+    db.update_text_matches(COMPANY, [job.id for job in filtered])
+    filter_jobs_by_qualifications_ai_based(filtered, resume_text, client=client, db=db)
+
+
+def streaming(archive: HttpArchive, db: JobsDatabase, client: OllamaClient, resume_text: str):
+    run_pipeline(
+        COMPANY,
+        resume_text=resume_text,
+        http_client=HttpClient(archive=archive),
+        db=db,
+        ollama_client=client,
+    )
+
+
+def run(name: str, flow, archive_path: Path, workdir: Path, latency: float, llm_latency: float):
+    timer = FirstResponseTimer(generate_handler)
+    with StubServer(timer, latency=llm_latency) as server, contextlib.redirect_stdout(io.StringIO()):
+        archive = HttpArchive(archive_path, mode=REPLAY, latency=latency)
+        db = JobsDatabase(workdir / f"{name}.db")
+        client = OllamaClient(base_url=server.url, pool_size=DEFAULT_MAX_IN_FLIGHT)
+        start = time.monotonic()
+        flow(archive, db, client, Resume().resume_text)
+        elapsed = time.monotonic() - start
+        verdicts = db._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE ai_match_reason IS NOT NULL"
+        ).fetchone()[0]
+        db.close()
+    first = timer.first_at - start if timer.first_at else float("nan")
+    print(f"{name:<10}{elapsed:8.2f}s total  first verdict after {first:6.2f}s  ({verdicts} verdicts)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per scraper request")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per LLM prompt")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        archive_path = workdir / "microsoft.jsonl.gz"
+        archive = HttpArchive(archive_path, mode=RECORD)
+        record_microsoft(archive, args.jobs)
+        archive.save()
+        for name, flow in (("staged", staged), ("streaming", streaming)):
+            run(name, flow, archive_path, workdir, args.latency, args.llm_latency)
@@ -0,0 +1,84 @@
+"""
+Benchmark fetching through HttpClient against a stub server that answers 429
+once clients exceed its rate, with and without the adaptive rate limiter.
+
+Run from the repository root:
+    python -m src.benchmarks.rate_limit --jobs 300 --server-rate 15
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.benchmarks.stub_server import StubServer
+from src.scrapers.http_client import HttpClient
+from src.scrapers.rate_limiter import RateLimiter
+
+MAX_ATTEMPTS = 50
+
+
+class UnlimitedRateLimiter(RateLimiter):
+    """Never waits: every worker sends as fast as it can and retries at once"""
+
+    def reserve(self, host: str) -> float:
+        return 0.0
+
+    def on_response(self, host, status_code, retry_after=None) -> float:
+        return 0.0
+
+
+def throttling_handler(rate: float):
+    """Handler that serves `rate` requests per second and 429s the rest"""
+    lock = threading.Lock()
+    state = {"tokens": rate, "updated": time.monotonic(), "throttled": 0}
+
+    def handler(method: str, path: str, body: bytes):
+        with lock:
+            now = time.monotonic()
+            state["tokens"] = min(rate, state["tokens"] + (now - state["updated"]) * rate)
+            state["updated"] = now
+            if state["tokens"] < 1:
+                state["throttled"] += 1
+                return 429, "text/plain", b"slow down"
+            state["tokens"] -= 1
+        return 200, "text/html", b"<html>job</html>"
+
+    return handler, state
+
+
+def run(name: str, limiter: RateLimiter, jobs: int, workers: int, server_rate: float, latency: float):
+    handler, state = throttling_handler(server_rate)
+    with StubServer(handler, latency=latency) as server, HttpClient(
+        use_tor=False, rate_limiter=limiter
+    ) as client:
+
+        def fetch(i: int) -> bool:
+            for _ in range(MAX_ATTEMPTS):
+                if client.get(f"{server.url}/jobs/{i}").ok:
+                    return True
+            return False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            fetched = sum(executor.map(fetch, range(jobs)))
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<10}{elapsed:8.2f}s  {fetched / elapsed:8.1f} pages/s  "
+        f"{server.request_count:>6} requests  {state['throttled']:>6} throttled  "
+        f"({jobs - fetched} gave up)"
+    )
+    if not isinstance(limiter, UnlimitedRateLimiter):
+        print(f"          {limiter.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--server-rate", type=float, default=15.0)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    run("unlimited", UnlimitedRateLimiter(), args.jobs, args.workers, args.server_rate, args.latency)
+    run("adaptive", RateLimiter(), args.jobs, args.workers, args.server_rate, args.latency)
@@ -0,0 +1,145 @@
+"""
+Benchmark the full scrape_jobs_for_company pipeline replayed from an HTTP archive.
+
+Without --archive a synthetic archive is generated for each company. To
+benchmark against real pages, record a run first:
+    python -m src.actions.scrape_jobs meta --record fixtures/meta.jsonl.gz
+
+Run from the repository root:
+    python -m src.benchmarks.scrape_replay --jobs 500 --latency 0.05
+    python -m src.benchmarks.scrape_replay --company meta --archive fixtures/meta.jsonl.gz
+"""
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from src.actions.scrape_jobs import ScrapeStats, scrape_jobs_for_company
+from src.benchmarks.meta_parse import synthetic_page
+from src.models.company import CompanyScrapers
+from src.models.job import JobPosting
+from src.scrapers.http_archive import HttpArchive, RECORD, REPLAY
+from src.scrapers.http_client import HttpClient
+from src.scrapers.meta import MetaScraper
+from src.scrapers.microsoft import MicrosoftScraper
+from src.storage.jobs_db import JobsDatabase
+
+MICROSOFT_PAGE_SIZE = 50
+# Cycled through the synthetic postings so some pass the text filter
+MICROSOFT_QUALIFICATIONS = [
+    "Bachelor's Degree in Computer Science; 2+ years coding in C++ or Python",
+    "Bachelor's Degree in Computer Science or related technical field",
+    "Master's Degree or PhD in Computer Science",
+]
+
+
+def record_meta(archive: HttpArchive, count: int):
+    scraper = MetaScraper(HttpClient(use_tor=False))
+    url, _, payload = scraper.build_get_job_listings_request()
+    listings = {
+        "data": {
+            "job_search": [
+                {"id": str(i), "title": f"Software Engineer {i}", "locations": ["Menlo Park, CA"]}
+                for i in range(count)
+            ]
+        }
+    }
+    archive.add("POST", url, 200, json.dumps(listings).encode(), data=payload)
+    for i in range(count):
+        job = JobPosting(company="meta", title="", id=str(i))
+        url, _ = scraper.build_get_job_with_details_request(job)
+        archive.add("GET", url, 200, synthetic_page(i))
+
+
+def record_microsoft(archive: HttpArchive, count: int):
+    scraper = MicrosoftScraper(HttpClient(use_tor=False))
+    pages = (count + MICROSOFT_PAGE_SIZE - 1) // MICROSOFT_PAGE_SIZE
+    for page in range(1, pages + 2):
+        ids = range((page - 1) * MICROSOFT_PAGE_SIZE, min(page * MICROSOFT_PAGE_SIZE, count))
+        jobs = [
+            {
+                "jobId": str(i),
+                "title": f"Software Engineer {i}",
+                "postingDate": "2025-01-15T00:00:00+00:00",
+                "properties": {
+                    "description": "Build and ship cloud services. " * 10,
+                    "locations": ["Redmond, Washington, United States"],
+                    "primaryLocation": "Redmond, Washington, United States",
+                },
+            }
+            for i in ids
+        ]
+        url, _, payload = scraper.build_get_job_listings_request(page)
+        body = {"operationResult": {"result": {"jobs": jobs, "totalJobs": count}}}
+        archive.add("GET", url, 200, json.dumps(body).encode(), data=payload)
+    for i in range(count):
+        job = JobPosting(company="microsoft", title="", id=str(i))
+        url, _ = scraper.build_get_job_with_details_request(job)
+        detail = {
+            "jobId": str(i),
+            "description": "Build and ship cloud services. " * 40,
+            "responsibilities": "Design, build and operate services",
+            "qualifications": MICROSOFT_QUALIFICATIONS[i % len(MICROSOFT_QUALIFICATIONS)],
+            "workLocations": ["Redmond, Washington, United States"],
+            "primaryWorkLocation": "Redmond, Washington, United States",
+        }
+        archive.add("GET", url, 200, json.dumps({"operationResult": {"result": detail}}).encode())
+
+
+SYNTHETIC_RECORDERS = {
+    CompanyScrapers.META: record_meta,
+    CompanyScrapers.MICROSOFT: record_microsoft,
+}
+
+
+def run(company: CompanyScrapers, archive_path: Path, workdir: Path, latency: float, verbose: bool):
+    archive = HttpArchive(archive_path, mode=REPLAY, latency=latency)
+    client = HttpClient(archive=archive)
+    db = JobsDatabase(workdir / f"{company.value}.db")
+    db.initialize_database()
+    stats = ScrapeStats(company=company.value)
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with output:
+        jobs = scrape_jobs_for_company(
+            company, force_refresh=True, stats=stats, http_client=client, db=db
+        )
+    elapsed = time.perf_counter() - start
+    db.close()
+
+    print(
+        f"{company.value:<12}{len(archive):>7} responses  {len(jobs):>6} jobs  "
+        f"{elapsed:7.2f}s  {len(jobs) / elapsed:>8,.0f} jobs/s  "
+        f"{stats.bytes_received / 1024 / elapsed:>8,.0f} KiB/s  "
+        f"misses={archive.misses} failed={stats.jobs_failed}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--company", choices=[c.value for c in SYNTHETIC_RECORDERS])
+    parser.add_argument("--archive", help="recorded archive to replay (needs --company)")
+    parser.add_argument("--jobs", type=int, default=500, help="postings per synthetic archive")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="simulated seconds per replayed request"
+    )
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's output")
+    args = parser.parse_args()
+    if args.archive and not args.company:
+        parser.error("--archive needs --company")
+
+    companies = [CompanyScrapers(args.company)] if args.company else list(SYNTHETIC_RECORDERS)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for company in companies:
+            archive_path = args.archive
+            if not archive_path:
+                archive_path = workdir / f"{company.value}.jsonl.gz"
+                archive = HttpArchive(archive_path, mode=RECORD)
+                SYNTHETIC_RECORDERS[company](archive, args.jobs)
+                archive.save()
+            run(company, Path(archive_path), workdir, args.latency, args.verbose)
@@ -0,0 +1,78 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from typing import Callable
+
+# A handler returns (status, content_type, body) for a request path, or
+# (status, content_type, body, headers) to send extra response headers. With
+# pass_headers=True it also receives the request headers as a fourth argument.
+Handler = Callable[..., tuple]
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections when more clients
+    # than that connect at once
+    request_queue_size = 128
+
+
+class StubServer:
+    """Threaded local HTTP server that answers every request with a fixed latency"""
+
+    def __init__(
+        self, handler: Handler, latency: float = 0.0, port: int = 0, pass_headers: bool = False
+    ):
+        self.handler = handler
+        self.latency = latency
+        self.pass_headers = pass_headers
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer(("127.0.0.1", port), self._build_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _build_handler(self):
+        stub = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with stub._lock:
+                    stub.request_count += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                args = (self.command, self.path, body)
+                if stub.pass_headers:
+                    args += (dict(self.headers.items()),)
+                status, content_type, payload, *extra = stub.handler(*args)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in (extra[0] if extra else {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _respond
+            do_POST = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        return _RequestHandler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,67 @@
+"""
+Benchmark QualificationFilter over synthetic jobs.
+
+Run from the repository root:
+    python -m src.benchmarks.text_filter --jobs 100000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from src.filters.qualifications import QualificationFilter
+from src.models.job import JobPosting
+
+TITLES = [
+    "Software Engineer",
+    "Software Engineer II",
+    "Senior Software Engineer, Tech Lead",
+    "Research Scientist, Machine Learning (PhD)",
+    "Engineering Manager, Infrastructure",
+    "Data Scientist, Product Analytics",
+    "Software Engineer, University Grad",
+]
+QUALIFICATIONS = [
+    "Bachelor's Degree in Computer Science or related technical field",
+    "3+ years of experience coding in C, C++, Java or Python",
+    "Master's degree or PhD in Computer Science",
+    "Master's degree or Bachelor's degree in a technical field",
+    "Experience with distributed systems and cloud platforms",
+    "Two years of professional software development experience",
+    "Knowledge of data structures, algorithms and operating systems",
+    "Ability to obtain and maintain a security clearance",
+]
+
+
+def synthetic_jobs(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        JobPosting(
+            company="microsoft",
+            title=rng.choice(TITLES),
+            id=str(i),
+            extra_qualifications=rng.sample(QUALIFICATIONS, rng.randint(2, 6)),
+        )
+        for i in range(count)
+    ]
+
+
+def run(count: int, strict: bool):
+    jobs = synthetic_jobs(count)
+    engine = QualificationFilter(strict=strict)
+    start = time.perf_counter()
+    results = list(engine.results(jobs))
+    elapsed = time.perf_counter() - start
+
+    reasons = Counter(result.reason or "passed" for result in results)
+    print(f"{count} jobs in {elapsed:.3f}s ({count / elapsed:,.0f} jobs/s, strict={strict})")
+    for reason, total in reasons.most_common():
+        print(f"  {reason:<50}{total:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--strict", action="store_true")
+    args = parser.parse_args()
+    run(args.jobs, args.strict)
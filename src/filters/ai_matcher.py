@@ -0,0 +1,372 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+from requests.adapters import HTTPAdapter
+from src.models.job import JobPosting
+from src.monitoring.metrics import METRICS
+from src.storage.jobs_db import JobsDatabase
+import hashlib
+import json
+import requests
+import threading
+import time
+
+OLLAMA_URL = "http://localhost:11434"
+DEFAULT_MODEL = "mistral"
+# Ollama serves OLLAMA_NUM_PARALLEL requests per model at once (4 by default
+# on machines with enough memory); more in-flight prompts just queue server-side
+DEFAULT_MAX_IN_FLIGHT = 4
+# Bump whenever build_prompt or the verdict parsing changes, so cached
+# verdicts produced by the old prompt stop matching
+PROMPT_VERSION = 3
+# How long Ollama keeps the model (and its prompt cache) loaded between requests
+KEEP_ALIVE = "30m"
+
+# How the static resume + instruction prefix reaches the model:
+#   "inline"  - prefix and job details concatenated into one prompt
+#   "system"  - prefix sent as the system prompt, job details as the prompt
+#   "context" - prefix evaluated once per run; later requests continue from
+#               the returned context tokens so it is never re-evaluated
+PROMPT_MODES = ("inline", "system", "context")
+DEFAULT_PROMPT_MODE = "system"
+
+# Static part of every prompt. It comes first so the model server can reuse
+# its evaluation across jobs; only JOB_PROMPT differs between requests.
+PROMPT_PREFIX = """
+Task: Analyze if a job posting is suitable for an entry-level candidate
+and a good match for the candidate's resume. Consider:
+1. Do you think he has a good chance of being the most competitive candidate for this job?
+2. Special emphasis that this does not expect a graduate degree and the work is computer programming.
+
+{answer_instructions}
+
+Candidate's Resume:
+{resume_text}
+"""
+
+FREE_TEXT_INSTRUCTIONS = """Make sure your answer includes "YES" if this is a good match for an entry-level candidate with this resume,
+and "NO" if it's not suitable. Limit yourself to 3 lines of text. Must be under 200 characters."""
+
+STRUCTURED_INSTRUCTIONS = """Answer with a JSON object only: "match" is true if this is a good match for an entry-level
+candidate with this resume and false if it's not suitable, "score" is how good a match it is from 0 to 1,
+and "reason" explains the verdict in under 200 characters."""
+
+JOB_PROMPT = """
+Job Details:
+Title: {title}
+Requirements: {requirements}
+Qualifications: {qualifications}
+"""
+
+# Schema passed as Ollama's `format` in structured mode, so the model can only
+# produce a parseable verdict
+VERDICT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "match": {"type": "boolean"},
+        "score": {"type": "number", "minimum": 0, "maximum": 1},
+        "reason": {"type": "string"},
+    },
+    "required": ["match", "score", "reason"],
+}
+# Generation cap in structured mode; a verdict object fits comfortably
+STRUCTURED_NUM_PREDICT = 96
+
+# Jobs looked up in the verdict cache per query
+CACHE_LOOKUP_BATCH = 100
+
+
+class OllamaClient:
+    """Pooled HTTP client for a local Ollama server with timeouts and bounded retries"""
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_URL,
+        timeout: float = 300,
+        max_retries: int = 2,
+        backoff: float = 1.0,
+        pool_size: int = DEFAULT_MAX_IN_FLIGHT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON payload and return the decoded response. Connection errors,
+        timeouts and 5xx responses are retried up to max_retries times with
+        exponential backoff; anything else raises immediately.
+        """
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.post(
+                    f"{self.base_url}{path}", json=payload, timeout=self.timeout
+                )
+                METRICS.observe("llm_request_seconds", time.perf_counter() - start, path=path)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    data = response.json()
+                    METRICS.inc("llm_tokens_total", data.get("prompt_eval_count") or 0, kind="prompt")
+                    METRICS.inc("llm_tokens_total", data.get("eval_count") or 0, kind="generated")
+                    return data
+                error = requests.HTTPError(
+                    f"Ollama returned {response.status_code}", response=response
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            METRICS.inc("llm_request_errors_total", path=path)
+            METRICS.event("llm_request_failed", path=path, attempt=attempt, error=str(error))
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * 2**attempt)
+        raise error
+
+    def generate(self, prompt: str, model: str = DEFAULT_MODEL, **params) -> Dict[str, Any]:
+        """Call /api/generate without streaming"""
+        return self.post(
+            "/api/generate", {"model": model, "prompt": prompt, "stream": False, **params}
+        )
+
+    def close(self):
+        self.session.close()
+
+
+@dataclass
+class PromptStats:
+    """Token counts and Ollama-reported time (seconds) accumulated over a run"""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    prompt_eval_time: float = 0.0
+    generated_tokens: int = 0
+    generation_time: float = 0.0
+    load_time: float = 0.0
+    total_time: float = 0.0
+    prefix_tokens: int = 0
+    prefix_eval_time: float = 0.0
+
+    def add(self, result: Dict[str, Any]):
+        # Ollama reports durations in nanoseconds
+        self.requests += 1
+        self.prompt_tokens += result.get("prompt_eval_count", 0)
+        self.prompt_eval_time += result.get("prompt_eval_duration", 0) / 1e9
+        self.generated_tokens += result.get("eval_count", 0)
+        self.generation_time += result.get("eval_duration", 0) / 1e9
+        self.load_time += result.get("load_duration", 0) / 1e9
+        self.total_time += result.get("total_duration", 0) / 1e9
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in asdict(self).items()
+        )
+
+
+@dataclass
+class AIVerdict:
+    job: JobPosting
+    is_match: bool = False
+    answer: Optional[str] = None
+    score: Optional[float] = None
+    error: Optional[str] = None
+    cached: bool = False
+
+
+class AIMatcher:
+    """
+    Asks a local LLM whether each job suits an entry-level candidate with the
+    given resume, keeping up to max_in_flight prompts in flight at once.
+
+    In structured mode the model must answer with a VERDICT_SCHEMA object, so
+    the verdict is a typed match flag and score rather than a search for "YES"
+    in free text, and generation is capped at STRUCTURED_NUM_PREDICT tokens.
+
+    With a cache database, verdicts are stored under a hash of the model,
+    PROMPT_VERSION, the resume and the job content, and jobs whose hash was
+    already answered skip the model call.
+    """
+
+    def __init__(
+        self,
+        resume_text: str,
+        client: Optional[OllamaClient] = None,
+        model: str = DEFAULT_MODEL,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        cache: Optional[JobsDatabase] = None,
+        prompt_mode: str = DEFAULT_PROMPT_MODE,
+        structured: bool = True,
+    ):
+        if prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"Unknown prompt mode: {prompt_mode}")
+        self.resume_text = resume_text
+        self.client = client or OllamaClient(pool_size=max_in_flight)
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.cache = cache
+        self.prompt_mode = prompt_mode
+        self.structured = structured
+        self.stats = PromptStats()
+        self._stats_lock = threading.Lock()
+        self._prefix_context = None
+        self._prefix_lock = threading.Lock()
+
+    def cache_key(self, job: JobPosting) -> str:
+        """Content hash identifying the verdict for this job"""
+        content = json.dumps(
+            [
+                self.model,
+                PROMPT_VERSION,
+                self.prompt_mode,
+                self.structured,
+                self.resume_text,
+                job.title,
+                job.requirements,
+                job.extra_qualifications,
+            ]
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def build_prefix(self) -> str:
+        return PROMPT_PREFIX.format(
+            answer_instructions=(
+                STRUCTURED_INSTRUCTIONS if self.structured else FREE_TEXT_INSTRUCTIONS
+            ),
+            resume_text=self.resume_text,
+        )
+
+    def build_prompt(self, job: JobPosting) -> str:
+        """Job-specific part of the prompt"""
+        # Combine job details into a comprehensive description
+        if job.requirements:
+            requirements = " ".join(job.requirements)
+        else:
+            requirements = "Just use the qualifications"
+        return JOB_PROMPT.format(
+            title=job.title,
+            requirements=requirements,
+            qualifications=" ".join(job.extra_qualifications or []),
+        )
+
+    def _get_prefix_context(self):
+        """Evaluate the prefix once and keep the context tokens Ollama returns"""
+        with self._prefix_lock:
+            if self._prefix_context is None:
+                result = self.client.generate(
+                    self.build_prefix(),
+                    model=self.model,
+                    keep_alive=KEEP_ALIVE,
+                    options={"num_predict": 1},
+                )
+                self._prefix_context = result["context"]
+                with self._stats_lock:
+                    self.stats.prefix_tokens += result.get("prompt_eval_count", 0)
+                    self.stats.prefix_eval_time += result.get("prompt_eval_duration", 0) / 1e9
+            return self._prefix_context
+
+    def _generate(self, job: JobPosting) -> Dict[str, Any]:
+        prompt = self.build_prompt(job)
+        params = {"model": self.model, "keep_alive": KEEP_ALIVE}
+        if self.structured:
+            params["format"] = VERDICT_SCHEMA
+            params["options"] = {"num_predict": STRUCTURED_NUM_PREDICT}
+        if self.prompt_mode == "inline":
+            prompt = self.build_prefix() + prompt
+        elif self.prompt_mode == "system":
+            params["system"] = self.build_prefix()
+        else:
+            params["context"] = self._get_prefix_context()
+        return self.client.generate(prompt, **params)
+
+    def match(self, job: JobPosting) -> AIVerdict:
+        """Get a verdict for one job. Errors are returned on the verdict, not raised."""
+        try:
+            result = self._generate(job)
+            with self._stats_lock:
+                self.stats.add(result)
+            answer = result["response"].strip()
+            if self.structured:
+                return self.parse_structured(job, answer)
+            return AIVerdict(job, "YES" in answer.upper(), answer)
+        except Exception as e:
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            return AIVerdict(job, error=str(e))
+
+    @staticmethod
+    def parse_structured(job: JobPosting, answer: str) -> AIVerdict:
+        """Turn a VERDICT_SCHEMA response into a verdict; the reason becomes the answer"""
+        try:
+            verdict = json.loads(answer)
+            is_match = verdict["match"]
+            if not isinstance(is_match, bool):
+                raise TypeError(f"match is {type(is_match).__name__}, not bool")
+            score = min(max(float(verdict["score"]), 0.0), 1.0)
+            reason = str(verdict.get("reason", "")).strip()
+        except (ValueError, TypeError, KeyError) as e:
+            return AIVerdict(job, answer=answer, error=f"Invalid structured verdict: {e}")
+        return AIVerdict(job, is_match, reason, score)
+
+    def match_cached(self, job: JobPosting) -> AIVerdict:
+        """
+        match() through the verdict cache, one job at a time. For callers that
+        receive jobs as a stream and can't wait to fill a lookup batch.
+        """
+        if self.cache is None:
+            return self.match(job)
+        key = self.cache_key(job)
+        hit = self.cache.get_cached_verdicts([key]).get(key)
+        if hit is not None:
+            is_match, answer, score = hit
+            return AIVerdict(job, is_match, answer, score, cached=True)
+        verdict = self.match(job)
+        if not verdict.error:
+            self.cache.store_cached_verdicts(
+                [(key, verdict.is_match, verdict.answer, verdict.score)]
+            )
+        return verdict
+
+    def iter_verdicts(self, jobs: Iterable[JobPosting]) -> Iterator[AIVerdict]:
+        """Yield a verdict per job while up to max_in_flight prompts run"""
+        with ThreadPoolExecutor(max_workers=max(1, self.max_in_flight)) as executor:
+            if self.cache is None:
+                yield from executor.map(self.match, jobs)
+                return
+
+            iterator = iter(jobs)
+            while batch := list(islice(iterator, CACHE_LOOKUP_BATCH)):
+                keys = [self.cache_key(job) for job in batch]
+                hits = self.cache.get_cached_verdicts(keys)
+                misses = []
+                for job, key in zip(batch, keys):
+                    if key in hits:
+                        is_match, answer, score = hits[key]
+                        yield AIVerdict(job, is_match, answer, score, cached=True)
+                    else:
+                        misses.append((job, key))
+
+                new_entries = []
+                for (_, key), verdict in zip(
+                    misses, executor.map(self.match, [job for job, _ in misses])
+                ):
+                    if not verdict.error:
+                        new_entries.append(
+                            (key, verdict.is_match, verdict.answer, verdict.score)
+                        )
+                    yield verdict
+                if new_entries:
+                    self.cache.store_cached_verdicts(new_entries)
+
+    def close(self):
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
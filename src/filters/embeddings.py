@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from src.filters.ai_matcher import OllamaClient
+from src.models.job import JobPosting
+from src.storage.jobs_db import JobsDatabase
+import hashlib
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"
+# Texts sent to /api/embed per request
+EMBED_BATCH_SIZE = 32
+
+
+class EmbeddingRanker:
+    """
+    Cheap pre-ranking stage in front of the generative AI filter.
+
+    Embeds the resume and each job's title, requirements and qualifications
+    with Ollama's /api/embed, scores every job by cosine similarity in one
+    matrix product, and keeps the top_k jobs and/or those scoring at least
+    min_score. Vectors are stored in the database under a hash of the model and
+    text, so each posting is embedded once.
+    """
+
+    def __init__(
+        self,
+        resume_text: str,
+        db: JobsDatabase,
+        client: Optional[OllamaClient] = None,
+        model: str = DEFAULT_EMBEDDING_MODEL,
+        top_k: Optional[int] = None,
+        min_score: Optional[float] = None,
+    ):
+        self.resume_text = resume_text
+        self.db = db
+        self.client = client or OllamaClient()
+        self.model = model
+        self.top_k = top_k
+        self.min_score = min_score
+
+    @staticmethod
+    def job_text(job: JobPosting) -> str:
+        return "\n".join(
+            [job.title or "", *(job.requirements or []), *(job.extra_qualifications or [])]
+        )
+
+    def content_hash(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\n{text}".encode()).hexdigest()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts, reusing stored vectors. Returns an (n, dimensions) float32 matrix."""
+        hashes = [self.content_hash(text) for text in texts]
+        stored = self.db.get_embeddings(set(hashes))
+        vectors: Dict[str, np.ndarray] = {
+            content_hash: np.frombuffer(vector, dtype=np.float32)
+            for content_hash, vector in stored.items()
+        }
+
+        missing = list({h: text for h, text in zip(hashes, texts) if h not in vectors}.items())
+        for start in range(0, len(missing), EMBED_BATCH_SIZE):
+            batch = missing[start:start + EMBED_BATCH_SIZE]
+            result = self.client.post(
+                "/api/embed", {"model": self.model, "input": [text for _, text in batch]}
+            )
+            new_rows = []
+            for (content_hash, _), embedding in zip(batch, result["embeddings"]):
+                vector = np.asarray(embedding, dtype=np.float32)
+                vectors[content_hash] = vector
+                new_rows.append((content_hash, self.model, len(vector), vector.tobytes()))
+            self.db.store_embeddings(new_rows)
+
+        return np.vstack([vectors[content_hash] for content_hash in hashes])
+
+    def rank(self, jobs: List[JobPosting]) -> List[Tuple[JobPosting, float]]:
+        """Return (job, cosine similarity to the resume) pairs, best first"""
+        if not jobs:
+            return []
+        resume = self.embed([self.resume_text])[0]
+        matrix = self.embed([self.job_text(job) for job in jobs])
+
+        resume = resume / (np.linalg.norm(resume) or 1.0)
+        norms = np.linalg.norm(matrix, axis=1)
+        norms[norms == 0] = 1.0
+        scores = (matrix @ resume) / norms
+
+        order = np.argsort(-scores)
+        return [(jobs[i], float(scores[i])) for i in order]
+
+    def partition(
+        self, jobs: List[JobPosting]
+    ) -> Tuple[List[JobPosting], List[Tuple[JobPosting, float, int]]]:
+        """
+        Split jobs into those worth a generative check, best first, and the
+        ranked-out rest as (job, similarity, 1-based rank) triples
+        """
+        selected, ranked_out = [], []
+        for rank, (job, score) in enumerate(self.rank(jobs), start=1):
+            if (self.min_score is not None and score < self.min_score) or (
+                self.top_k is not None and len(selected) >= self.top_k
+            ):
+                ranked_out.append((job, score, rank))
+            else:
+                selected.append(job)
+        return selected, ranked_out
+
+    def select(self, jobs: List[JobPosting]) -> List[JobPosting]:
+        """Jobs worth a generative check, best first"""
+        return self.partition(jobs)[0]
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+from src.models.job import JobPosting
+import re
+
+YEARS_PATTERN = re.compile(
+    r"(?:([2-9]|\d{2,})(?:\s*[-+]?\s*(?:years?|yrs?|y)|(?:[^\w\d]{1,5})(?:years?|yrs?|yr)))"
+    r"|"
+    r"(?:(two|three|four|five|six|seven|eight|nine|ten)(?:\+|&#43;)?\s*(?:&nbsp;|\s)*(?:year|yr)s?)"
+)
+
+GRAD_DEGREE_PATTERN = re.compile(
+    r"(?:M\.S\.?|Ph\.?\s?D\.?|PhD|[Mm]aster(?:[\\u0027]|\')?s|[Dd]octorate)(?:\s|\(|\)|$)"
+)
+BACHELORS_PATTERN = re.compile(
+    r"(BA|BS|Bachelor(?:[\\u0027]|\')?s?|BACHELOR|B\.S\.?)"
+)
+
+LEADERSHIP_PATTERN = re.compile(
+    r"(?:[Ll]ead(?:er|ership)?|[Mm]anager(?:ial)?|[Dd]irect(?:or|ing))"
+)
+
+RESEARCH_PATTERN = re.compile(r"(?:[Rr]esearch|[Dd]ata\s+[Ss]cientist)")
+
+# Joins a job's qualifications so each pattern runs once over the whole text.
+# The leading newline keeps GRAD_DEGREE_PATTERN's trailing (?:\s|$) matching at
+# the end of every qualification, and the run of six NULs is longer than the
+# five separator characters YEARS_PATTERN tolerates, so no match can straddle
+# two qualifications.
+QUALIFICATION_SEPARATOR = "\n" + "\x00" * 6
+
+# The helpers below put literal substring checks, which run at C speed, in
+# front of the patterns above, so a regex only runs on text that can match it.
+
+# Every YEARS_PATTERN match ends in a unit starting with "y", preceded by a
+# digit, a separator or one of these words
+NUMBER_WORDS = ("two", "three", "four", "five", "six", "seven", "eight", "nine", "ten")
+# How far before a "y" YEARS_PATTERN is re-run. Only a number separated from
+# its unit by a longer run of whitespace or &nbsp; would be missed.
+YEARS_WINDOW = 64
+
+
+def mentions_grad_degree(text: str) -> bool:
+    # Every GRAD_DEGREE_PATTERN match contains one of these substrings
+    return (
+        "Ph" in text or "aster" in text or "M.S" in text or "octorate" in text
+    ) and GRAD_DEGREE_PATTERN.search(text) is not None
+
+
+def mentions_leadership(title_lower: str) -> bool:
+    # On lowercased text this is exactly LEADERSHIP_PATTERN
+    return (
+        "lead" in title_lower
+        or "manager" in title_lower
+        or "director" in title_lower
+        or "directing" in title_lower
+    )
+
+
+def mentions_years(text: str) -> bool:
+    """
+    Equivalent to YEARS_PATTERN.search(text) (up to YEARS_WINDOW), but the
+    pattern only runs just before a "y" that could start a unit
+    """
+    i = text.find("y")
+    while i != -1:
+        if i and (not text[i - 1].isalpha() or text.endswith(NUMBER_WORDS, 0, i)):
+            if YEARS_PATTERN.search(text, max(0, i - YEARS_WINDOW), i + 5):
+                return True
+        i = text.find("y", i + 1)
+    return False
+
+
+# Reasons reported in FilterResult.reason
+GRAD_DEGREE_IN_TITLE = "graduate degree in title"
+LEADERSHIP_ROLE = "leadership role"
+RESEARCH_ROLE = "research role"
+YEARS_OF_EXPERIENCE = "years of experience required"
+GRAD_DEGREE_REQUIRED = "graduate degree required"
+GRAD_DEGREE_ONLY = "graduate degree without bachelor's alternative"
+
+
+@dataclass
+class FilterResult:
+    job: JobPosting
+    passed: bool
+    reason: Optional[str] = None
+
+
+class QualificationFilter:
+    """
+    Text-based filter for entry-level positions.
+
+    Title checks run once per job and the qualification checks run once over
+    the joined qualification text, behind literal keyword prefilters. Only the
+    non-strict graduate degree rule, which needs a bachelor's alternative in the
+    same qualification, falls back to a per-qualification scan when the joined
+    text mentions a graduate degree. Jobs without qualifications pass.
+    """
+
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+
+    def check(self, job: JobPosting) -> FilterResult:
+        qualifications = job.extra_qualifications or []
+        if not qualifications:
+            return FilterResult(job, True)
+
+        title = job.title or ""
+        if mentions_grad_degree(title):
+            return FilterResult(job, False, GRAD_DEGREE_IN_TITLE)
+        title_lower = title.lower()
+        if mentions_leadership(title_lower):
+            return FilterResult(job, False, LEADERSHIP_ROLE)
+        if self.strict and RESEARCH_PATTERN.search(title_lower):
+            return FilterResult(job, False, RESEARCH_ROLE)
+
+        text = QUALIFICATION_SEPARATOR.join(qualifications)
+        if mentions_years(text):
+            return FilterResult(job, False, YEARS_OF_EXPERIENCE)
+        if mentions_grad_degree(text):
+            if self.strict:
+                return FilterResult(job, False, GRAD_DEGREE_REQUIRED)
+            for qualification in qualifications:
+                if mentions_grad_degree(qualification) and not BACHELORS_PATTERN.search(qualification):
+                    return FilterResult(job, False, GRAD_DEGREE_ONLY)
+
+        return FilterResult(job, True)
+
+    def results(self, jobs: Iterable[JobPosting]) -> Iterator[FilterResult]:
+        """Check every job, yielding passing and rejected results alike"""
+        return (self.check(job) for job in jobs)
+
+    def filter(self, jobs: Iterable[JobPosting]) -> List[JobPosting]:
+        """Return only the jobs that pass"""
+        return [result.job for result in self.results(jobs) if result.passed]
@@ -1,8 +1,14 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Optional, List
 from datetime import datetime
+import hashlib
+import json
+import sys
 
-@dataclass
+# Leading characters of the description that count towards the listing hash
+HASH_DESCRIPTION_CHARS = 500
+
+@dataclass(slots=True)
 class JobPosting:
   company: str
   title: str
@@ -23,3 +29,37 @@ class JobPosting:
   ai_match: Optional[List[str]] = None
   ai_match_reason: Optional[str] = None
   applied_on: Optional[datetime] = None
+  ai_match_score: Optional[float] = None
+  # listing_hash() of the listing this posting was scraped from
+  content_hash: Optional[str] = None
+
+  def __post_init__(self):
+    # Every posting of a company shares a single company string
+    if isinstance(self.company, str):
+      self.company = sys.intern(self.company)
+
+  def merge(self, other: "JobPosting") -> "JobPosting":
+    """
+    Return a new posting with the fields set on this one, falling back to
+    other for any field that is None here.
+    """
+    merged = {}
+    for field in fields(self):
+      value = getattr(self, field.name)
+      merged[field.name] = value if value is not None else getattr(other, field.name)
+    return JobPosting(**merged)
+
+  def listing_hash(self) -> str:
+    """
+    Hash of the listing-level fields (title, posted date, locations and the
+    start of the description). A posting whose hash is unchanged since the
+    last scrape does not need its detail page fetched again.
+    """
+    listing = [
+      self.title,
+      self.posted_date.isoformat() if self.posted_date else None,
+      self.location,
+      self.locations,
+      (self.description or "")[:HASH_DESCRIPTION_CHARS],
+    ]
+    return hashlib.sha256(json.dumps(listing, default=str).encode()).hexdigest()
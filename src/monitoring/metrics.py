@@ -0,0 +1,224 @@
+import bisect
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class Histogram:
+    """Fixed-bucket histogram of observed values, as Prometheus models them"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf overflow, not cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(self.buckets + ("+Inf",), self.counts)
+                if count
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters, gauges and latency histograms keyed by name and
+    labels, plus an optional structured event log (one JSON object per line).
+
+    Instrumented code records into the module-level METRICS registry; the
+    entry points decide whether to write the log, the end-of-run JSON report
+    and the Prometheus text file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._log = None
+        self.started_at = time.time()
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the wall time of the with-block into histogram name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def histogram_sum(self, name: str) -> float:
+        """Sum of every value observed into histogram name, across all labels"""
+        with self._lock:
+            return sum(histogram.sum for histogram in self._histograms.get(name, {}).values())
+
+    def open_log(self, path: str):
+        """Start appending structured events to path"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+            self._log = open(path, "a", encoding="utf-8")
+
+    def event(self, name: str, **fields):
+        """Write one structured log line; a no-op unless a log is open"""
+        if self._log is None:
+            return
+        line = json.dumps({"ts": round(time.time(), 6), "event": name, **fields}, default=str)
+        with self._lock:
+            if self._log is not None:
+                self._log.write(line + "\n")
+
+    def close_log(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every metric as plain data, for the JSON report"""
+
+        def series(metrics, encode):
+            return {
+                name: [{"labels": dict(key), "value": encode(value)} for key, value in values.items()]
+                for name, values in sorted(metrics.items())
+            }
+
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "counters": series(self._counters, lambda value: value),
+                "gauges": series(self._gauges, lambda value: value),
+                "histograms": series(self._histograms, Histogram.to_dict),
+            }
+
+    def write_report(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, default=str)
+
+    def write_prometheus(self, path: str):
+        """Write every metric in the Prometheus text exposition format"""
+
+        def labels_text(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ""
+            escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+            return "{" + ",".join(
+                f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)
+            ) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self._counters), ("gauge", self._gauges)):
+                for name, values in sorted(metrics.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    lines.extend(f"{name}{labels_text(key)} {value}" for key, value in values.items())
+            for name, values in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in values.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(
+                            f"{name}_bucket{labels_text(key, (('le', str(bound)),))} {cumulative}"
+                        )
+                    lines.append(f"{name}_sum{labels_text(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{labels_text(key)} {histogram.count}")
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+METRICS = MetricsRegistry()
+
+
+def add_metrics_arguments(parser):
+    """--metrics-log/--metrics-report/--prometheus options for an entry point"""
+    parser.add_argument("--metrics-log", metavar="PATH", help="append structured events (JSON lines) to PATH")
+    parser.add_argument("--metrics-report", metavar="PATH", help="write an end-of-run JSON metrics report to PATH")
+    parser.add_argument("--prometheus", metavar="PATH", help="write metrics in Prometheus text format to PATH")
+
+
+def start_metrics(args):
+    if args.metrics_log:
+        METRICS.open_log(args.metrics_log)
+
+
+def finish_metrics(args):
+    if args.metrics_report:
+        METRICS.write_report(args.metrics_report)
+        print(f"Metrics report written to {args.metrics_report}")
+    if args.prometheus:
+        METRICS.write_prometheus(args.prometheus)
+        print(f"Prometheus metrics written to {args.prometheus}")
+    METRICS.close_log()
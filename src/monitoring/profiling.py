@@ -0,0 +1,185 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.monitoring.metrics import METRICS
+
+DEFAULT_PROFILE_DIR = "profiles"
+# Functions listed in each section of the hot-function report
+REPORT_TOP = 40
+# Stacks holding less than this many microseconds are left out of the flamegraph
+MIN_STACK_MICROSECONDS = 100
+
+# (label, histogram) pairs used to attribute wall time to pipeline stages
+STAGE_HISTOGRAMS = (
+    ("network", "http_request_seconds"),
+    ("rate-limit wait", "http_rate_limit_wait_seconds"),
+    ("parsing", "parse_seconds"),
+    ("SQLite writes", "db_write_seconds"),
+    ("LLM", "llm_request_seconds"),
+)
+
+FunctionKey = Tuple[str, int, str]
+
+
+def _label(func: FunctionKey) -> str:
+    """Flamegraph frame name for a pstats function key"""
+    filename, lineno, name = func
+    if filename == "~":
+        # Builtins, e.g. "<method 'acquire' of '_thread.lock' objects>"
+        text = name
+    else:
+        text = f"{Path(filename).stem}:{lineno}:{name}"
+    return text.replace(";", ",").replace(" ", "_")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """
+    Rebuild "frame;frame;frame" -> microseconds of self time from cProfile's
+    caller/callee edges.
+
+    cProfile only keeps one level of callers, so a function called from
+    several places has its time split between them in proportion to the time
+    each call edge accounts for. Recursive calls are cut at the first repeat.
+    """
+    entries = stats.stats
+    callees: Dict[FunctionKey, Dict[FunctionKey, float]] = defaultdict(dict)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_time) in callers.items():
+            callees[caller][func] = edge_time
+
+    folded: Dict[str, int] = defaultdict(int)
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    todo: List[Tuple[FunctionKey, Tuple[FunctionKey, ...], float]] = [
+        (root, (), 1.0) for root in roots
+    ]
+    while todo:
+        func, path, share = todo.pop()
+        path = path + (func,)
+        _, _, self_time, _, _ = entries[func]
+        micros = int(self_time * share * 1e6)
+        if micros:
+            folded[";".join(_label(frame) for frame in path)] += micros
+        for callee, edge_time in callees.get(func, {}).items():
+            total_time = entries[callee][3] if callee in entries else 0
+            if callee in path or total_time <= 0:
+                continue
+            callee_share = share * min(1.0, edge_time / total_time)
+            if total_time * callee_share * 1e6 >= MIN_STACK_MICROSECONDS:
+                todo.append((callee, path, callee_share))
+    return folded
+
+
+class RunProfiler:
+    """
+    cProfile over the calling thread and every thread it starts.
+
+    Before 3.12 a cProfile.Profile only sees the thread that enabled it, so
+    each new thread enables its own profiler from a threading.setprofile hook
+    and the results are merged at the end. From 3.12 on cProfile is built on
+    sys.monitoring, which already covers every thread and allows a single
+    active profiler.
+    """
+
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.thread_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._per_thread = sys.version_info < (3, 12)
+
+    def _start_thread(self, frame, event, arg):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.thread_profiles.append(profile)
+        # Replaces this hook as the thread's profile function
+        profile.enable()
+
+    def __enter__(self):
+        if self._per_thread:
+            threading.setprofile(self._start_thread)
+        self.main.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.main.disable()
+        if self._per_thread:
+            threading.setprofile(None)
+
+    def stats(self, stream=None) -> pstats.Stats:
+        stats = pstats.Stats(self.main, stream=stream)
+        with self._lock:
+            for profile in self.thread_profiles:
+                profile.disable()
+                stats.add(profile)
+        return stats
+
+
+def stage_times(before: Dict[str, float]) -> Dict[str, float]:
+    """Seconds each stage's histogram gained since before was taken"""
+    return {
+        label: METRICS.histogram_sum(name) - before.get(label, 0.0)
+        for label, name in STAGE_HISTOGRAMS
+    }
+
+
+def format_stage_times(stages: Dict[str, float], wall_time: float) -> str:
+    """
+    Table of stage thread-seconds against the wall time. Stages run on
+    several threads at once, so their total can exceed the wall time.
+    """
+    lines = [f"{'stage':<16} {'seconds':>9} {'of wall':>8}"]
+    for label, seconds in stages.items():
+        share = seconds / wall_time if wall_time else 0.0
+        lines.append(f"{label:<16} {seconds:>9.2f} {share:>8.0%}")
+    return "\n".join(lines)
+
+
+def profile_run(
+    func: Callable[[], Any], name: str, output_dir: str = DEFAULT_PROFILE_DIR, top: int = REPORT_TOP
+) -> Any:
+    """
+    Run func under RunProfiler and write, to output_dir:
+        <name>.pstats  raw stats, for pstats/snakeviz
+        <name>.txt     hot functions by own time and by cumulative time
+        <name>.folded  collapsed stacks for flamegraph.pl or speedscope
+    then print where the wall time went. Returns func's result.
+    """
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    before = {label: METRICS.histogram_sum(name) for label, name in STAGE_HISTOGRAMS}
+    start = time.perf_counter()
+    with RunProfiler() as profiler:
+        result = func()
+    wall_time = time.perf_counter() - start
+    stages = stage_times(before)
+
+    report = io.StringIO()
+    stats = profiler.stats(stream=report)
+    stats.dump_stats(directory / f"{name}.pstats")
+    report.write(f"Wall time: {wall_time:.2f}s\n\n")
+    report.write(format_stage_times(stages, wall_time) + "\n\n")
+    report.write("Hot functions by own time\n")
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(top)
+    report.write("Hot functions by cumulative time\n")
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    (directory / f"{name}.txt").write_text(report.getvalue(), encoding="utf-8")
+
+    folded = collapsed_stacks(stats)
+    with open(directory / f"{name}.folded", "w", encoding="utf-8") as f:
+        for stack, micros in sorted(folded.items()):
+            f.write(f"{stack} {micros}\n")
+
+    print(f"Profiled {name} in {wall_time:.2f}s")
+    print(format_stage_times(stages, wall_time))
+    print(
+        f"Profile written to {directory / name}.txt, .pstats and .folded "
+        f"({len(folded)} stacks)"
+    )
+    return result
@@ -1,18 +1,68 @@
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass
+from typing import List, Optional
 from src.models.job import JobPosting
 
+
+@dataclass
+class ListingPage:
+    """One page of search results, with whatever the site told us about the rest"""
+
+    jobs: List[JobPosting]
+    page: int
+    # Total number of results across all pages, if the site reports it
+    total_count: Optional[int] = None
+    page_size: Optional[int] = None
+    # True when no page after this one has results
+    is_last: bool = False
+
+    @property
+    def page_count(self) -> Optional[int]:
+        if not self.total_count or not self.page_size:
+            return None
+        return -(-self.total_count // self.page_size)
+
+
 class BaseScraper(ABC):
-    """Base class that all company scrapers must implement"""
+    """
+    Base class that all company scrapers must implement.
+
+    A scraper owns its HttpClient (Tor controller and pooled sessions), so one
+    instance should be used for a whole run and closed at the end, ideally via
+    `with scraper:`.
+    """
+
+    http_client = None
+
+    def close(self):
+        """Release the Tor controller and HTTP sessions"""
+        if self.http_client is not None:
+            self.http_client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     @abstractmethod
     def get_job_listings(self) -> List[JobPosting]:
         """Get basic job listings (title, location, etc)"""
         pass
 
+    def get_listing_page(self, page: int = 1) -> ListingPage:
+        """
+        Get one page of listings. Scrapers that know the result count or the
+        final page should override this so pagination can fan out or stop early.
+        """
+        return ListingPage(jobs=self.get_job_listings(page=page), page=page)
+
     @abstractmethod
-    def get_job_with_details(self, job: JobPosting) -> JobPosting:
-        """Enrich a job with its full description and requirements"""
+    def get_job_with_details(self, job: JobPosting, revalidate: bool = False) -> JobPosting:
+        """
+        Enrich a job with its full description and requirements. revalidate
+        bypasses a fresh cached detail page, for listings known to have changed.
+        """
         pass
 
     def is_overqualified(self, job: JobPosting, years_experience: int, skills: List[str]) -> bool:
@@ -0,0 +1,164 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class ArchiveMiss(LookupError):
+    """Raised when a replayed request was never recorded"""
+
+
+class ArchivedResponse:
+    """
+    The parts of a curl_cffi Response the scrapers read, rebuilt from an
+    archive entry
+    """
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+class HttpArchive:
+    """
+    Request/response pairs stored in a gzip-compressed JSON-lines file.
+
+    In record mode every response the client receives is appended and the
+    file is written on save(). In replay mode the file is loaded up front and
+    requests are answered from it without touching the network. Requests are
+    matched on method, URL and body; when the same request was recorded more
+    than once the responses are replayed in recorded order and the last one
+    repeats, so a replayed run is deterministic. latency adds a simulated
+    network delay to every replayed response.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY, latency: float = 0.0):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown archive mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.misses = 0
+        self._entries: List[dict] = []
+        self._by_key: Dict[str, List[dict]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self.load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @staticmethod
+    def request_key(method: str, url: str, data: Any = None, json_body: Any = None) -> str:
+        """Digest of everything that identifies a request, headers excluded"""
+        body = json_body if json_body is not None else data
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, sort_keys=True)
+        if isinstance(body, str):
+            body = body.encode()
+        digest = hashlib.sha256(f"{method.upper()} {url}\n".encode())
+        digest.update(body or b"")
+        return digest.hexdigest()
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        status_code: int,
+        content: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        data: Any = None,
+        json_body: Any = None,
+    ):
+        """Append a response for a request"""
+        entry = {
+            "key": self.request_key(method, url, data, json_body),
+            "method": method.upper(),
+            "url": url,
+            "status": status_code,
+            "headers": dict(headers or {}),
+            "content": base64.b64encode(content or b"").decode("ascii"),
+        }
+        with self._lock:
+            self._index(entry)
+
+    def record(self, method: str, url: str, response, data: Any = None, json_body: Any = None):
+        """Append a live response received by the client"""
+        self.add(
+            method,
+            url,
+            response.status_code,
+            response.content,
+            headers={k: v for k, v in response.headers.items()},
+            data=data,
+            json_body=json_body,
+        )
+
+    def replay(self, method: str, url: str, data: Any = None, json_body: Any = None) -> ArchivedResponse:
+        key = self.request_key(method, url, data, json_body)
+        with self._lock:
+            responses = self._by_key.get(key)
+            if not responses:
+                self.misses += 1
+                raise ArchiveMiss(f"No recorded response for {method.upper()} {url}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            entry = responses[min(cursor, len(responses) - 1)]
+        if self.latency:
+            time.sleep(self.latency)
+        return ArchivedResponse(
+            entry["url"],
+            entry["status"],
+            entry["headers"],
+            base64.b64decode(entry["content"]),
+        )
+
+    def _index(self, entry: dict):
+        self._entries.append(entry)
+        self._by_key.setdefault(entry["key"], []).append(entry)
+
+    def load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+
+    def save(self):
+        """Write every recorded entry; a no-op in replay mode"""
+        if not self.recording:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            entries = list(self._entries)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,193 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.monitoring.metrics import METRICS
+from src.scrapers.http_archive import ArchivedResponse
+
+DEFAULT_CACHE_PATH = "data/http_cache.db"
+# Cached pages younger than this are served without touching the network
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+# Least recently used pages are evicted once the cache grows past this size
+DEFAULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        url TEXT PRIMARY KEY,
+        status INTEGER NOT NULL,
+        headers TEXT NOT NULL,
+        content BLOB NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        size INTEGER NOT NULL,
+        stored_at REAL NOT NULL,
+        last_used_at REAL NOT NULL
+    )
+"""
+
+
+@dataclass
+class CachedPage:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def to_response(self) -> ArchivedResponse:
+        return ArchivedResponse(self.url, self.status, self.headers, self.content)
+
+
+class HttpCache:
+    """
+    On-disk response cache for GET requests, keyed by URL and stored in its
+    own SQLite file.
+
+    A page younger than ttl seconds is served straight from disk. An older
+    one (or any page when revalidate=True) is revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 with no body. Once the
+    stored bodies exceed max_bytes the least recently used pages are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        revalidate: bool = False,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self.hits = 0
+        self.not_modified = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self._conn.execute(CACHE_SCHEMA)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used_at)"
+        )
+        self._conn.commit()
+        self._size = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, content, etag, last_modified, stored_at "
+                "FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, content, etag, last_modified, stored_at = row
+        return CachedPage(url, status, json.loads(headers), content, etag, last_modified, stored_at)
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        return not self.revalidate and time.time() - page.stored_at < self.ttl
+
+    @staticmethod
+    def conditional_headers(page: CachedPage) -> Dict[str, str]:
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def store(self, url: str, response):
+        """Cache a freshly downloaded response, replacing any previous copy"""
+        headers = {k: v for k, v in response.headers.items()}
+        lowered = {k.lower(): v for k, v in headers.items()}
+        if "no-store" in lowered.get("cache-control", ""):
+            return
+        content = response.content or b""
+        now = time.time()
+        METRICS.inc("http_cache_total", result="stored")
+        with self._lock:
+            self.misses += 1
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, status, headers, content, etag, last_modified, size, stored_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.status_code,
+                    json.dumps(headers),
+                    content,
+                    lowered.get("etag"),
+                    lowered.get("last-modified"),
+                    len(content),
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._size += len(content) - (previous[0] if previous else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def hit(self, page: CachedPage) -> ArchivedResponse:
+        """Serve a fresh page from disk"""
+        METRICS.inc("http_cache_total", result="fresh")
+        with self._lock:
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_used_at = ? WHERE url = ?", (time.time(), page.url)
+            )
+            self._conn.commit()
+        return page.to_response()
+
+    def revalidated(self, page: CachedPage) -> ArchivedResponse:
+        """Serve a page the server answered 304 for, restarting its TTL"""
+        now = time.time()
+        METRICS.inc("http_cache_total", result="not_modified")
+        with self._lock:
+            self.not_modified += 1
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_used_at = ? WHERE url = ?",
+                (now, now, page.url),
+            )
+            self._conn.commit()
+        return page.to_response()
+
+    def _evict(self):
+        """Drop least recently used pages until the cache is back under max_bytes"""
+        # Another process may share the file, so start from the real total
+        self._size = self._stored_bytes()
+        rows = self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_used_at"
+        )
+        evicted = []
+        for url, size in rows:
+            if self._size <= self.max_bytes:
+                break
+            evicted.append((url,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+        self._conn.commit()
+        METRICS.inc("http_cache_evictions_total", len(evicted))
+
+    def summary(self) -> str:
+        return f"{self.hits} fresh, {self.not_modified} not modified, {self.misses} fetched"
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,17 +1,68 @@
 from curl_cffi import requests
 from stem import Signal
 from stem.control import Controller
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import urlsplit
+from src.scrapers.http_archive import HttpArchive
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.rate_limiter import RateLimiter
+from src.monitoring.metrics import METRICS
+
+# Idle sessions HttpClient keeps per host and circuit; sessions released
+# beyond this are closed
+MAX_IDLE_SESSIONS = 16
 
 class HttpClient:
-    def __init__(self, use_tor: bool = True):
+    """
+    curl_cffi client with Tor rotation and per-host rate limiting. With
+    pooled=True (the default) it keeps a pool of persistent sessions per host
+    and Tor circuit. A request borrows an idle session (or opens one) and
+    returns it afterwards, so consecutive requests from any thread reuse TLS
+    connections instead of handshaking through the proxy every time, and
+    short-lived worker threads leave no sessions behind.
+
+    With an archive in record mode every response is also saved to it; in
+    replay mode requests are answered from the archive and never reach the
+    network (Tor is not started).
+
+    With a cache, GET requests made with cacheable=True are served from disk
+    while fresh and revalidated with conditional headers once stale (or
+    straight away with revalidate=True).
+    """
+
+    def __init__(
+        self,
+        use_tor: bool = True,
+        pooled: bool = True,
+        archive: Optional[HttpArchive] = None,
+        cache: Optional[HttpCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        if archive is not None and archive.replaying:
+            use_tor = False
         self.use_tor = use_tor
         self.tor_controller = self._setup_tor() if use_tor else None
-        self.last_request_time = 0
-        self.min_request_interval = 2
+        # Per-host adaptive rate limiting, shared by every thread using this
+        # client
+        self.rate_limiter = rate_limiter or RateLimiter()
         self.requests_before_rotate = 25  # New: rotate IP every N requests
         self.request_count = 0  # New: track request count
+        self.bytes_received = 0
+        # Bumped on every new Tor identity. Pooled sessions are keyed by it so
+        # connections opened over an old circuit are never reused.
+        self.circuit = 0
+        # Guards the rotation bookkeeping when the client is shared by
+        # several detail-fetch workers
+        self._lock = threading.Lock()
+
+        self.pooled = pooled
+        self.archive = archive
+        self.cache = cache
+        # Idle sessions by (host, circuit), plus every open session for close()
+        self._idle: Dict[Tuple[str, int], List[requests.Session]] = {}
+        self._sessions: List[requests.Session] = []
 
         # Standard headers for browser impersonation
         self.default_headers = {
@@ -39,51 +90,192 @@ class HttpClient:
             return None
 
     def _get_tor_proxy(self) -> Dict[str, str]:
+        # Tor isolates streams by SOCKS credentials (IsolateSOCKSAuth), so a
+        # per-circuit username keeps pooled connections on a single circuit
+        proxy = f'socks5h://circuit{self.circuit}:x@127.0.0.1:9050'
         return {
-            'http': 'socks5h://127.0.0.1:9050',
-            'https': 'socks5h://127.0.0.1:9050'
+            'http': proxy,
+            'https': proxy
         }
 
-    def new_tor_identity(self):
-        """Request new Tor identity"""
-        if self.tor_controller:
-            self.tor_controller.signal(Signal.NEWNYM)
-            time.sleep(5)  # Wait for new identity to be ready
+    def _newnym_wait(self) -> float:
+        """Seconds until Tor will accept another NEWNYM (it ignores ones sent sooner)"""
+        if not self.tor_controller:
+            return 0.0
+        return self.tor_controller.get_newnym_wait()
 
-    def request(self, method: str, url: str, headers: Dict = None, **kwargs) -> requests.Response:
-        """Make HTTP request with curl_cffi, rate limiting and proxy handling"""
-        # Rotate Tor identity if needed
-        if self.use_tor and self.request_count >= self.requests_before_rotate:
-            self.new_tor_identity()
-            self.request_count = 0
+    def _signal_new_identity(self) -> bool:
+        if not self.tor_controller:
+            return False
+        self.tor_controller.signal(Signal.NEWNYM)
+        self.circuit += 1
+        METRICS.inc('tor_rotations_total')
+        METRICS.event('tor_rotation', circuit=self.circuit)
+        return True
+
+    def _prepare_request(self, url: str, headers: Optional[Dict]) -> Tuple[Dict[str, str], bool, float]:
+        """
+        Merge headers with defaults, report whether the identity should rotate
+        and reserve a rate-limit slot, returning the seconds to wait for it
+        """
+        with self._lock:
+            rotate = self.use_tor and self.request_count >= self.requests_before_rotate
+            if rotate:
+                self.request_count = 0
 
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        # if time_since_last < self.min_request_interval:
-            # time.sleep(self.min_request_interval - time_since_last)
+        wait = self.rate_limiter.reserve(self._host(url))
 
         # Merge headers with defaults
         request_headers = self.default_headers.copy()
         if headers:
             request_headers.update(headers)
+        return request_headers, rotate, wait
+
+    def _record_request(
+        self, method: str, url: str, response: requests.Response, seconds: float, source: str = 'network'
+    ):
+        size = len(response.content or b"")
+        with self._lock:
+            self.request_count += 1  # New: increment request counter
+            self.bytes_received += size
+        host = self._host(url)
+        METRICS.inc('http_requests_total', method=method.upper(), host=host, status=response.status_code)
+        METRICS.inc('http_bytes_received_total', size, host=host)
+        METRICS.observe('http_request_seconds', seconds, host=host, source=source)
+        METRICS.event(
+            'http_request', method=method.upper(), url=url, status=response.status_code,
+            bytes=size, seconds=round(seconds, 6), source=source,
+        )
 
-        # Add Tor proxy if enabled
-        if self.use_tor:
-            kwargs['proxies'] = self._get_tor_proxy()
+    def _adapt_rate(self, url: str, response: requests.Response):
+        """Feed a live response back into the rate limiter"""
+        self.rate_limiter.on_response(
+            self._host(url), response.status_code, response.headers.get('Retry-After')
+        )
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlsplit(url).netloc
 
-        # Make request with curl_cffi
-        response = requests.request(
-            method,
-            url,
-            headers=request_headers,
+    def _acquire_session(self, url: str) -> Tuple[Tuple[str, int], requests.Session]:
+        """Borrow an idle session for url's host on the current circuit, or open one"""
+        key = (self._host(url), self.circuit)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return key, idle.pop()
+        session = requests.Session(
             impersonate="chrome120",  # Use curl_cffi's browser impersonation
-            **kwargs
+            proxies=self._get_tor_proxy() if self.use_tor else None,
         )
+        with self._lock:
+            self._sessions.append(session)
+        return key, session
 
-        self.last_request_time = time.time()
-        self.request_count += 1  # New: increment request counter
+    def _release_session(self, key: Tuple[str, int], session: requests.Session):
+        """Return a borrowed session to the pool, closing it if the pool is full"""
+        to_close = []
+        with self._lock:
+            # Connections opened over a previous circuit are never reused
+            for stale_key in [k for k in self._idle if k[1] != self.circuit]:
+                to_close.extend(self._idle.pop(stale_key))
+            idle = self._idle.setdefault(key, []) if key[1] == self.circuit else None
+            if idle is not None and len(idle) < MAX_IDLE_SESSIONS:
+                idle.append(session)
+            else:
+                to_close.append(session)
+        for stale in to_close:
+            self._close_session(stale)
 
+    def _close_session(self, session: requests.Session):
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.close()
+
+    def new_tor_identity(self):
+        """Request new Tor identity, waiting only if Tor would ignore the signal"""
+        wait = self._newnym_wait()
+        if wait > 0:
+            time.sleep(wait)
+        self._signal_new_identity()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict = None,
+        cacheable: bool = False,
+        revalidate: bool = False,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Make HTTP request with curl_cffi, rate limiting and proxy handling.
+        revalidate sends a cached page's conditional headers even while it is
+        fresh, for pages known to have changed.
+        """
+        if self.archive is not None and self.archive.replaying:
+            start = time.perf_counter()
+            response = self.archive.replay(
+                method, url, kwargs.get('data'), kwargs.get('json')
+            )
+            self._record_request(method, url, response, time.perf_counter() - start, 'replay')
+            return response
+
+        cached_page = None
+        cacheable = cacheable and self.cache is not None and method.upper() == 'GET'
+        if cacheable:
+            cached_page = self.cache.get(url)
+            if cached_page is not None:
+                if not revalidate and self.cache.is_fresh(cached_page):
+                    return self.cache.hit(cached_page)
+                headers = {**(headers or {}), **self.cache.conditional_headers(cached_page)}
+
+        request_headers, rotate, wait = self._prepare_request(url, headers)
+        # Rotate Tor identity if needed
+        if rotate:
+            self.new_tor_identity()
+        if wait > 0:
+            time.sleep(wait)
+
+        start = time.perf_counter()
+        if self.pooled:
+            key, session = self._acquire_session(url)
+            try:
+                response = session.request(
+                    method,
+                    url,
+                    headers=request_headers,
+                    **kwargs
+                )
+            except BaseException:
+                # A failed transfer may leave the connection unusable
+                self._close_session(session)
+                raise
+            self._release_session(key, session)
+        else:
+            # Add Tor proxy if enabled
+            if self.use_tor:
+                kwargs['proxies'] = self._get_tor_proxy()
+
+            # Make request with curl_cffi
+            response = requests.request(
+                method,
+                url,
+                headers=request_headers,
+                impersonate="chrome120",  # Use curl_cffi's browser impersonation
+                **kwargs
+            )
+
+        if self.archive is not None and self.archive.recording:
+            self.archive.record(method, url, response, kwargs.get('data'), kwargs.get('json'))
+        self._record_request(method, url, response, time.perf_counter() - start)
+        self._adapt_rate(url, response)
+
+        if cached_page is not None and response.status_code == 304:
+            return self.cache.revalidated(cached_page)
+        if cacheable and response.ok:
+            self.cache.store(url, response)
         return response
 
     def get(self, url: str, **kwargs) -> requests.Response:
@@ -93,3 +285,25 @@ class HttpClient:
     def post(self, url: str, **kwargs) -> requests.Response:
         """Convenience method for POST requests"""
         return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Close every pooled session and the Tor controller, saving any recording"""
+        if self.archive is not None:
+            self.archive.save()
+        if self.cache is not None:
+            self.cache.close()
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+        if self.tor_controller:
+            self.tor_controller.close()
+            self.tor_controller = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
@@ -1,25 +1,107 @@
 from datetime import datetime
-from typing import List
-from src.scrapers.base_scraper import BaseScraper
+from typing import List, Optional
+from src.scrapers.base_scraper import BaseScraper, ListingPage
 from src.models.job import JobPosting
 from src.scrapers.http_client import HttpClient
+from src.monitoring.metrics import METRICS
 from bs4 import BeautifulSoup
 import json
 
+LD_JSON_TYPE = b"application/ld+json"
+
+
+def extract_ld_json(content: bytes) -> Optional[dict]:
+    """
+    Slice the first <script type="application/ld+json"> block straight out of
+    the raw page bytes and decode it. Returns None when the block can't be
+    located or decoded, so callers can fall back to a full HTML parse.
+    """
+    marker = content.find(LD_JSON_TYPE)
+    while marker != -1:
+        tag_start = content.rfind(b"<script", 0, marker)
+        # The marker must sit inside the opening <script ...> tag itself
+        if tag_start != -1 and content.find(b">", tag_start, marker) == -1:
+            body_start = content.find(b">", marker)
+            body_end = content.find(b"</script>", body_start)
+            if body_start == -1 or body_end == -1:
+                return None
+            try:
+                return json.loads(content[body_start + 1:body_end])
+            except ValueError:
+                return None
+        marker = content.find(LD_JSON_TYPE, marker + len(LD_JSON_TYPE))
+    return None
+
+
+def parse_ld_json_with_soup(text: str) -> Optional[dict]:
+    """Slow path: build the full DOM and look the ld+json script up"""
+    soup = BeautifulSoup(text, "html.parser")
+    script_tag = soup.find("script", {"type": "application/ld+json"})
+    return json.loads(script_tag.string) if script_tag else None
+
 
 class MetaScraper(BaseScraper):
-    def __init__(self):
-        self.http_client = HttpClient()
+    """
+    Meta's job search GraphQL query has no page offset, so listing retrieval
+    is a single fetch of every matching posting. By default it is reported as
+    one last page; with results_per_page it is split into pages locally.
+    """
+
+    def __init__(
+        self,
+        http_client: Optional[HttpClient] = None,
+        results_per_page: Optional[int] = None,
+    ):
+        self.http_client = http_client or HttpClient()
+        # Page size used to split the full result set; None serves it as one page
+        self.results_per_page = results_per_page
+        # Result set of the last page-1 fetch, sliced for later pages
+        self._listings: Optional[List[JobPosting]] = None
 
     def get_job_listings(self, page: int = 1, attempt: int = 0) -> List[JobPosting]:
         """
         Scrapes Meta's job board for basic listings using their GraphQL API
         """
+        return self.get_listing_page(page=page, attempt=attempt).jobs
+
+    def get_listing_page(self, page: int = 1, attempt: int = 0) -> ListingPage:
+        """
+        Page 1 fetches the whole result set. With results_per_page set it is
+        served in pages of that size, and later pages are sliced from the
+        same fetch; otherwise page 1 is the last page and later pages are
+        empty. Later pages never cost a request.
+        """
+        if page == 1 or self._listings is None:
+            if page > 1 and not self.results_per_page:
+                return ListingPage(jobs=[], page=page, is_last=True)
+            self._listings = self.fetch_all_listings(attempt)
+        listings = self._listings
+
+        if not self.results_per_page:
+            return ListingPage(
+                jobs=listings if page == 1 else [],
+                page=page,
+                total_count=len(listings),
+                is_last=True,
+            )
+        start = (page - 1) * self.results_per_page
+        end = start + self.results_per_page
+        return ListingPage(
+            jobs=listings[start:end],
+            page=page,
+            total_count=len(listings),
+            page_size=self.results_per_page,
+            is_last=end >= len(listings),
+        )
+
+    def fetch_all_listings(self, attempt: int = 0) -> List[JobPosting]:
+        """Every matching posting, from one GraphQL request"""
         url, headers, payload = self.build_get_job_listings_request()
         response = self.http_client.request("POST", url, headers=headers, data=payload)
 
         if response.ok:
-            return self.parse_get_job_listings(response)
+            with METRICS.timer("parse_seconds", company="meta", kind="listing"):
+                return self.parse_get_job_listings(response)
         else:
             if attempt < 3 and (
                 response.status_code == 429
@@ -27,7 +109,7 @@ class MetaScraper(BaseScraper):
                 or response.status_code == 403
             ):
                 self.http_client.new_tor_identity()
-                return self.get_job_listings(attempt=attempt + 1)
+                return self.fetch_all_listings(attempt=attempt + 1)
             else:
                 print(f"Error fetching job listings: {response.status_code}")
                 return []
@@ -73,6 +155,8 @@ class MetaScraper(BaseScraper):
             "is_leadership": False,
             "is_remote_only": False,
             "sort_by_new": True,
+            # The query has no page offset, so anything but the full result
+            # set would drop listings
             "results_per_page": None,
         }
 
@@ -125,16 +209,21 @@ class MetaScraper(BaseScraper):
             print(f"Error parsing job listings: {e}")
             return []
 
-    def get_job_with_details(self, job: JobPosting) -> JobPosting | None:
+    def get_job_with_details(self, job: JobPosting, revalidate: bool = False) -> JobPosting | None:
         """
         Fetches full job description and requirements
         """
         url, headers = self.build_get_job_with_details_request(job)
-        response = self.http_client.request("GET", url, headers=headers)
-        print(f"made request to {url}")  # TODO: set up logging/monitoring
+        # Detail pages go through the client's HTTP cache, if it has one
+        response = self.http_client.request(
+            "GET", url, headers=headers, cacheable=True, revalidate=revalidate
+        )
+        METRICS.event("detail_fetched", company="meta", job_id=job.id, status=response.status_code)
         if response.ok:
-            return self.parse_get_job_with_details(job, response)
+            with METRICS.timer("parse_seconds", company="meta", kind="detail"):
+                return self.parse_get_job_with_details(job, response)
         else:
+            METRICS.inc("detail_fetch_failures_total", company="meta", status=response.status_code)
             print(f"Failed to fetch job details: {response.status_code}")
             return None
 
@@ -144,8 +233,6 @@ class MetaScraper(BaseScraper):
         headers = {
             "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
             "accept-language": "en-US,en;q=0.9",
-            "cache-control": "no-cache",
-            "pragma": "no-cache",
             "priority": "u=0, i",
             "referer": "https://www.metacareers.com/jobs/?teams[0]=University%20Grad%20-%20Engineering%2C%20Tech%20%26%20Design&teams[1]=Software%20Engineering&teams[2]=Infrastructure&teams[3]=AR%2FVR&teams[4]=Artificial%20Intelligence&teams[5]=Data%20Center&teams[6]=Design%20%26%20User%20Experience&teams[7]=Enterprise%20Engineering&offices[0]=Seattle%2C%20WA&offices[1]=Bellevue%2C%20WA&offices[2]=Redmond%2C%20WA&offices[3]=Austin%2C%20TX&offices[4]=Temple%2C%20TX&offices[5]=Fremont%2C%20CA&offices[6]=Menlo%20Park%2C%20CA&offices[7]=Mountain%20View%2C%20CA&offices[8]=Newark%2C%20CA&offices[9]=Sunnyvale%2C%20CA&offices[10]=Santa%20Clara%2C%20CA&offices[11]=San%20Francisco%2C%20CA&offices[12]=San%20Mateo%2C%20CA&offices[13]=Foster%20City%2C%20CA&sort_by_new=true",
             "sec-ch-ua": '"Not(A:Brand";v="99", "Brave";v="133", "Chromium";v="133"',
@@ -155,11 +242,10 @@ class MetaScraper(BaseScraper):
     def parse_get_job_with_details(
         self, existing_job: JobPosting, response
     ) -> JobPosting:
-        soup = BeautifulSoup(response.text, "html.parser")
-        script_tag = soup.find("script", {"type": "application/ld+json"})
-        if script_tag:
-            data = json.loads(script_tag.string)
-
+        data = extract_ld_json(response.content)
+        if data is None:
+            data = parse_ld_json_with_soup(response.text)
+        if data:
             # Map Meta's schema.org data to our JobPosting model
             mapped_data = {
                 "title": data.get("title"),
@@ -194,13 +280,9 @@ class MetaScraper(BaseScraper):
                 "posting_url": data.get("url"),
             }
 
-            # Merge with existing job's data, preferring new data when available
-            existing_data = {
-                k: v for k, v in existing_job.__dict__.items() if v is not None
-            }
-            merged_data = {**mapped_data, **existing_data}
-
-            return JobPosting(**merged_data)
+            # Merge with existing job's data, keeping the listing's values
+            # and filling the gaps from the detail page
+            return existing_job.merge(JobPosting(**mapped_data))
         else:
             print("Data script tag not found")
             return None
@@ -1,26 +1,35 @@
 from datetime import datetime
-from typing import List
-from src.scrapers.base_scraper import BaseScraper
+from typing import List, Optional
+from src.scrapers.base_scraper import BaseScraper, ListingPage
 from src.models.job import JobPosting
 from src.scrapers.http_client import HttpClient
+from src.monitoring.metrics import METRICS
 from bs4 import BeautifulSoup
 import json
 
+# Results per search page (the pgSz parameter)
+PAGE_SIZE = 50
+
 
 class MicrosoftScraper(BaseScraper):
-    def __init__(self):
-        self.http_client = HttpClient()
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        self.http_client = http_client or HttpClient()
 
     def get_job_listings(self, page: int = 1, attempt: int = 0) -> List[JobPosting]:
         """
         Scrapes Microsoft's job board for basic listings using their GraphQL API
         """
+        return self.get_listing_page(page=page, attempt=attempt).jobs
+
+    def get_listing_page(self, page: int = 1, attempt: int = 0) -> ListingPage:
+        """One search page, along with the total result count the API reports"""
         print(f"Fetching page {page}")
         url, headers, payload = self.build_get_job_listings_request(page)
         response = self.http_client.request("GET", url, headers=headers, data=payload)
 
         if response.ok:
-            return self.parse_get_job_listings(response)
+            with METRICS.timer("parse_seconds", company="microsoft", kind="listing"):
+                return self.parse_listing_page(response, page)
         else:
             if attempt < 3 and (
                 response.status_code == 429
@@ -28,13 +37,13 @@ class MicrosoftScraper(BaseScraper):
                 or response.status_code == 403
             ):
                 self.http_client.new_tor_identity()
-                return self.get_job_listings(page=page, attempt=attempt + 1)
+                return self.get_listing_page(page=page, attempt=attempt + 1)
             else:
                 print(f"Error fetching job listings: {response.status_code}")
-                return []
+                return ListingPage(jobs=[], page=page)
 
     def build_get_job_listings_request(self, page: int = 1):
-        url = f"https://gcsservices.careers.microsoft.com/search/api/v1/search?lc=Washington%2C%20United%20States&lc=Austin%2C%20Texas%2C%20United%20States&lc=California%2C%20United%20States&p=Data%20Center&p=Engineering&p=Security%20Engineering&p=Software%20Engineering&rt=Individual%20Contributor&l=en_us&pg={page}&pgSz=50&o=Relevance&flt=true"
+        url = f"https://gcsservices.careers.microsoft.com/search/api/v1/search?lc=Washington%2C%20United%20States&lc=Austin%2C%20Texas%2C%20United%20States&lc=California%2C%20United%20States&p=Data%20Center&p=Engineering&p=Security%20Engineering&p=Software%20Engineering&rt=Individual%20Contributor&l=en_us&pg={page}&pgSz={PAGE_SIZE}&o=Relevance&flt=true"
 
         payload = {}
         headers = {
@@ -61,7 +70,25 @@ class MicrosoftScraper(BaseScraper):
         return url, headers, payload
 
     def parse_get_job_listings(self, response) -> List[JobPosting]:
+        return self.parse_listing_page(response).jobs
+
+    def parse_listing_page(self, response, page: int = 1) -> ListingPage:
         data = json.loads(response.text)
+        # Error responses carry "operationResult": null; they parse as an
+        # empty last page
+        result = (data.get("operationResult") or {}).get("result") or {}
+        total_count = result.get("totalJobs")
+        jobs = self.parse_jobs(data)
+        return ListingPage(
+            jobs=jobs,
+            page=page,
+            total_count=total_count,
+            page_size=PAGE_SIZE,
+            is_last=len(jobs) < PAGE_SIZE
+            or (total_count is not None and page * PAGE_SIZE >= total_count),
+        )
+
+    def parse_jobs(self, data: dict) -> List[JobPosting]:
         try:
             raw_jobs = data["operationResult"]["result"]["jobs"]
             assert isinstance(raw_jobs, list)
@@ -85,16 +112,21 @@ class MicrosoftScraper(BaseScraper):
             print(f"Error parsing job listings: {e}")
             return []
 
-    def get_job_with_details(self, job: JobPosting) -> JobPosting | None:
+    def get_job_with_details(self, job: JobPosting, revalidate: bool = False) -> JobPosting | None:
         """
         Fetches full job description and requirements
         """
         url, headers = self.build_get_job_with_details_request(job)
-        response = self.http_client.request("GET", url, headers=headers)
-        print(f"made request to {url}")  # TODO: set up logging/monitoring
+        # Detail pages go through the client's HTTP cache, if it has one
+        response = self.http_client.request(
+            "GET", url, headers=headers, cacheable=True, revalidate=revalidate
+        )
+        METRICS.event("detail_fetched", company="microsoft", job_id=job.id, status=response.status_code)
         if response.ok:
-            return self.parse_get_job_with_details(job, response)
+            with METRICS.timer("parse_seconds", company="microsoft", kind="detail"):
+                return self.parse_get_job_with_details(job, response)
         else:
+            METRICS.inc("detail_fetch_failures_total", company="microsoft", status=response.status_code)
             print(f"Failed to fetch job details: {response.status_code}")
             return None
 
@@ -105,9 +137,7 @@ class MicrosoftScraper(BaseScraper):
             "accept": "application/json, text/plain, */*",
             "accept-language": "en-US,en;q=0.5",
             "authorization": "Bearer undefined",
-            "cache-control": "no-cache",
             "origin": "https://jobs.careers.microsoft.com",
-            "pragma": "no-cache",
             "priority": "u=1, i",
             "referer": "https://jobs.careers.microsoft.com/",
             "sec-ch-ua": '"Not(A:Brand";v="99", "Brave";v="133", "Chromium";v="133"',
@@ -169,19 +199,16 @@ class MicrosoftScraper(BaseScraper):
 
         mapped_data = {
             "company": "microsoft",
+            "title": existing_job.title,
             "description": description,
             "extra_qualifications": extra_qualifications,
             "responsibilities": responsibilities,
             "locations": locations,
             "location": location,
         }
-        # Merge with existing job's data, preferring new data when available
-        existing_data = {
-            k: v for k, v in existing_job.__dict__.items() if v is not None
-        }
-        merged_data = {**mapped_data, **existing_data}
-
-        return JobPosting(**merged_data)
+        # Merge with existing job's data, keeping the listing's values
+        # and filling the gaps from the detail page
+        return existing_job.merge(JobPosting(**mapped_data))
 
     def is_overqualified(
         self, job: JobPosting, years_experience: int, skills: List[str]
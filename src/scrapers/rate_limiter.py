@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from src.monitoring.metrics import METRICS
+
+# Statuses that mean the site wants us to slow down
+THROTTLE_STATUSES = {403, 429, 503}
+
+DEFAULT_INITIAL_RATE = 2.0  # requests per second per host
+DEFAULT_MIN_RATE = 0.1
+DEFAULT_MAX_RATE = 20.0
+DEFAULT_BURST = 4
+# AIMD: every success adds RATE_INCREASE req/s, every throttle multiplies by
+# RATE_DECREASE. Until a host first throttles, successes multiply the rate by
+# SLOW_START_FACTOR instead, so the limit is found quickly.
+RATE_INCREASE = 0.1
+RATE_DECREASE = 0.5
+SLOW_START_FACTOR = 1.05
+# Throttles of requests already in flight when the rate was cut are one
+# signal, not several: the rate is cut at most once per this many seconds
+DECREASE_COOLDOWN = 1.0
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 120.0
+
+
+@dataclass
+class HostBucket:
+    """Token bucket and counters for one host"""
+
+    rate: float
+    capacity: float
+    tokens: float
+    updated: float = field(default_factory=time.monotonic)
+    # Nothing is sent to the host before this time (Retry-After or backoff)
+    blocked_until: float = 0.0
+    last_decrease: float = 0.0
+    slow_start: bool = True
+    consecutive_throttles: int = 0
+    requests: int = 0
+    throttled: int = 0
+    waited: float = 0.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given as seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Per-host token buckets with AIMD-adaptive rates.
+
+    reserve() never blocks: it takes a token under a lock and returns how long
+    the caller must wait before sending, so worker threads sharing the limiter
+    sleep outside the lock. Successful responses raise a host's rate
+    additively. Throttling responses halve it and block the host for the
+    Retry-After delay, or for a jittered exponential backoff when the server
+    gives none. Until the first throttle the rate grows multiplicatively (slow
+    start).
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = DEFAULT_INITIAL_RATE,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        burst: int = DEFAULT_BURST,
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._buckets: Dict[str, HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> HostBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = HostBucket(rate=self.initial_rate, capacity=self.burst, tokens=self.burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def reserve(self, host: str) -> float:
+        """Take a token for host and return the seconds to wait before sending"""
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.tokens = min(
+                bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate
+            )
+            bucket.updated = now
+            # Tokens may go negative: each waiter queues behind the previous one
+            bucket.tokens -= 1
+            wait = max(-bucket.tokens / bucket.rate, bucket.blocked_until - now, 0.0)
+            bucket.requests += 1
+            bucket.waited += wait
+        METRICS.observe("http_rate_limit_wait_seconds", wait, host=host)
+        return wait
+
+    def on_response(self, host: str, status_code: int, retry_after: Optional[str] = None) -> float:
+        """
+        Adapt host's rate to a response. Returns the enforced delay in seconds
+        when the response was a throttle, 0 otherwise.
+        """
+        with self._lock:
+            bucket = self._bucket(host)
+            if status_code not in THROTTLE_STATUSES:
+                if status_code < 400:
+                    bucket.consecutive_throttles = 0
+                    if bucket.slow_start:
+                        rate = bucket.rate * SLOW_START_FACTOR
+                    else:
+                        rate = bucket.rate + RATE_INCREASE
+                    bucket.rate = min(self.max_rate, rate)
+                METRICS.set_gauge("http_rate_limit_rate", bucket.rate, host=host)
+                return 0.0
+
+            bucket.throttled += 1
+            bucket.slow_start = False
+            bucket.consecutive_throttles += 1
+            now = time.monotonic()
+            if now - bucket.last_decrease >= DECREASE_COOLDOWN:
+                bucket.rate = max(self.min_rate, bucket.rate * RATE_DECREASE)
+                bucket.last_decrease = now
+            delay = parse_retry_after(retry_after)
+            if delay is None:
+                backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (bucket.consecutive_throttles - 1))
+                # Equal jitter: half fixed, half random, so workers don't retry in lockstep
+                delay = backoff / 2 + random.uniform(0, backoff / 2)
+            bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            # Drop any banked burst so the host restarts at the reduced rate
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.updated = now
+            rate = bucket.rate
+        METRICS.inc("http_throttled_total", host=host, status=status_code)
+        METRICS.set_gauge("http_rate_limit_rate", rate, host=host)
+        METRICS.event("http_throttled", host=host, status=status_code, delay=round(delay, 3), rate=rate)
+        return delay
+
+    def metrics(self) -> Dict[str, dict]:
+        """Per-host rate, request, throttle and wait counters"""
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(bucket.rate, 3),
+                    "requests": bucket.requests,
+                    "throttled": bucket.throttled,
+                    "waited_seconds": round(bucket.waited, 3),
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{host}: {m['requests']} requests at {m['rate']:.2f}/s, "
+            f"{m['throttled']} throttled, {m['waited_seconds']:.1f}s waiting"
+            for host, m in self.metrics().items()
+        )
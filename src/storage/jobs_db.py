@@ -1,56 +1,238 @@
 from datetime import datetime
+import json
 import sqlite3
+import threading
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from src.models.job import JobPosting
 from src.models.company import CompanyScrapers
+from src.monitoring.metrics import METRICS
+
+DEFAULT_DB_PATH = "data/jobs.db"
+
+# Rows written per transaction by the bulk-write API
+DEFAULT_FLUSH_SIZE = 500
+
+# Existing jobs are updated in place. Scraped columns are overwritten, while
+# match results and applied_on keep their stored value unless the incoming
+# posting carries one, so a refresh never wipes what the user or filters set.
+# The match flags are bound by number (?17, ?18) so a new row gets FALSE, as
+# the column default would give it, while an update still sees the raw NULL.
+INSERT_JOB_SQL = """
+    INSERT INTO jobs
+    (id, company, title, location, locations, posting_url, posted_date,
+    description, requirements, salary_range, team, teams, level,
+    responsibilities, extra_qualifications, scraped_at, text_match,
+    ai_match, ai_match_reason, applied_on, ai_match_score, content_hash)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12, ?13, ?14, ?15, ?16,
+        COALESCE(?17, FALSE), COALESCE(?18, FALSE), ?19, ?20, ?21, ?22)
+    ON CONFLICT (id, company) DO UPDATE SET
+        title = excluded.title,
+        location = excluded.location,
+        locations = excluded.locations,
+        posting_url = excluded.posting_url,
+        posted_date = excluded.posted_date,
+        description = excluded.description,
+        requirements = excluded.requirements,
+        salary_range = excluded.salary_range,
+        team = excluded.team,
+        teams = excluded.teams,
+        level = excluded.level,
+        responsibilities = excluded.responsibilities,
+        extra_qualifications = excluded.extra_qualifications,
+        scraped_at = excluded.scraped_at,
+        text_match = COALESCE(?17, jobs.text_match),
+        ai_match = COALESCE(?18, jobs.ai_match),
+        ai_match_reason = COALESCE(excluded.ai_match_reason, jobs.ai_match_reason),
+        applied_on = COALESCE(excluded.applied_on, jobs.applied_on),
+        ai_match_score = COALESCE(excluded.ai_match_score, jobs.ai_match_score),
+        content_hash = COALESCE(excluded.content_hash, jobs.content_hash)
+"""
+
+UPDATE_AI_MATCH_SQL = """
+    UPDATE jobs
+    SET ai_match = ?,
+        ai_match_reason = ?,
+        ai_match_score = ?
+    WHERE company = ? AND id = ?
+"""
+
+# Applied to every connection. synchronous=NORMAL is durable under WAL except
+# for the last transactions on power loss; cache_size is in KiB when negative.
+CONNECTION_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "cache_size": -20000,
+    "busy_timeout": 5000,
+}
+
+# Ordered (version, statements) pairs. initialize_database applies every
+# version newer than the one recorded in schema_version, so existing
+# data/jobs.db files upgrade in place. Append new migrations; never edit old ones.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (1, [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT,
+            company TEXT,
+            title TEXT NOT NULL,
+            location TEXT,
+            locations TEXT, /* Stored as JSON array */
+            posting_url TEXT,
+            posted_date TIMESTAMP,
+            description TEXT,
+            requirements TEXT, /* Stored as JSON array */
+            salary_range TEXT,
+            team TEXT,
+            teams TEXT, /* Stored as JSON array */
+            level TEXT,
+            responsibilities TEXT, /* Stored as JSON array */
+            extra_qualifications TEXT, /* Stored as JSON array */
+            scraped_at TIMESTAMP,
+            text_match BOOLEAN DEFAULT FALSE,
+            ai_match BOOLEAN DEFAULT FALSE,
+            ai_match_reason TEXT,
+            applied_on TIMESTAMP,
+            PRIMARY KEY (id, company)
+        )
+        """,
+    ]),
+    (2, [
+        "CREATE INDEX IF NOT EXISTS idx_jobs_company_scraped_at ON jobs (company, scraped_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_company_matches ON jobs (company, text_match, ai_match)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_applied_on ON jobs (applied_on)",
+    ]),
+    (3, [
+        """
+        CREATE TABLE IF NOT EXISTS ai_verdicts (
+            cache_key TEXT PRIMARY KEY, /* Hash of model, prompt version, resume and job content */
+            is_match BOOLEAN NOT NULL,
+            answer TEXT,
+            created_at TIMESTAMP NOT NULL,
+            last_used_at TIMESTAMP NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_ai_verdicts_last_used_at ON ai_verdicts (last_used_at)",
+    ]),
+    (4, [
+        """
+        CREATE TABLE IF NOT EXISTS embeddings (
+            content_hash TEXT PRIMARY KEY, /* Hash of the embedding model and embedded text */
+            model TEXT NOT NULL,
+            dimensions INTEGER NOT NULL,
+            vector BLOB NOT NULL, /* float32 array */
+            created_at TIMESTAMP NOT NULL
+        )
+        """,
+    ]),
+    (5, [
+        "ALTER TABLE jobs ADD COLUMN ai_match_score REAL",
+        "ALTER TABLE ai_verdicts ADD COLUMN score REAL",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_company_ai_match_score ON jobs (company, ai_match_score)",
+    ]),
+    (6, [
+        "ALTER TABLE jobs ADD COLUMN content_hash TEXT /* JobPosting.listing_hash() */",
+    ]),
+]
+
+# Columns of the jobs table that map onto JobPosting fields, and how iter_jobs
+# decodes them
+JOB_COLUMNS = (
+    "id", "company", "title", "location", "locations", "posting_url",
+    "posted_date", "description", "requirements", "salary_range", "team",
+    "teams", "level", "responsibilities", "extra_qualifications",
+    "text_match", "ai_match", "ai_match_reason", "applied_on", "ai_match_score",
+    "content_hash",
+)
+JSON_COLUMNS = {"locations", "requirements", "teams", "responsibilities", "extra_qualifications"}
+TIMESTAMP_COLUMNS = {"posted_date", "applied_on"}
+BOOLEAN_COLUMNS = {"text_match", "ai_match"}
+
+# (company, job id, is_match, match_reason, match_score)
+AIMatch = Tuple[CompanyScrapers, str, bool, str, Optional[float]]
+
+
+def _chunks(items: Iterable, size: int):
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
 
 class JobsDatabase:
-    def __init__(self, db_path: str = "data/jobs.db"):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
         self.initialize_database()
 
+    def _connection(self) -> sqlite3.Connection:
+        """Long-lived connection shared by the bulk-write API"""
+        if self._conn is None:
+            self._conn = self._connect(check_same_thread=False)
+        return self._conn
+
+    def close(self):
+        """Close the long-lived connection, if one was opened"""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection with the per-connection pragmas applied"""
+        conn = sqlite3.connect(self.db_path, **kwargs)
+        for pragma, value in CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+
     def initialize_database(self):
-        """Create the database and tables if they don't exist"""
+        """
+        Create the database and bring its schema up to the latest version.
+
+        Each migration runs in its own BEGIN IMMEDIATE transaction that
+        re-reads the current version first, so a failed migration leaves no
+        trace and concurrent JobsDatabase instances (threads or processes)
+        apply every version exactly once.
+        """
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id TEXT,
-                    company TEXT,
-                    title TEXT NOT NULL,
-                    location TEXT,
-                    locations TEXT, /* Stored as JSON array */
-                    posting_url TEXT,
-                    posted_date TIMESTAMP,
-                    description TEXT,
-                    requirements TEXT, /* Stored as JSON array */
-                    salary_range TEXT,
-                    team TEXT,
-                    teams TEXT, /* Stored as JSON array */
-                    level TEXT,
-                    responsibilities TEXT, /* Stored as JSON array */
-                    extra_qualifications TEXT, /* Stored as JSON array */
-                    scraped_at TIMESTAMP,
-                    text_match BOOLEAN DEFAULT FALSE,
-                    ai_match BOOLEAN DEFAULT FALSE,
-                    ai_match_reason TEXT,
-                    applied_on TIMESTAMP,
-                    PRIMARY KEY (id, company)
-                )
-            """)
-            conn.commit()
+        # Autocommit mode: sqlite3 would otherwise commit before every DDL
+        # statement, splitting a migration over several transactions
+        conn = self._connect(isolation_level=None)
+        try:
+            # WAL is persistent, so setting it once per file is enough. It lets
+            # a dashboard read while a scrape is writing.
+            conn.execute("PRAGMA journal_mode = WAL")
+            for version, statements in MIGRATIONS:
+                # Takes the write lock, so no other connection can migrate
+                # between the version check and the commit
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+                    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+                    if version > (row[0] or 0):
+                        for statement in statements:
+                            conn.execute(statement)
+                        conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        finally:
+            conn.close()
 
     def update_job(self, job: JobPosting, company_name: CompanyScrapers) -> bool:
         """
         Update an existing job in the database
         Returns True if job was updated, False if job didn't exist
         """
-        import json
-
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
             # Check if job exists
@@ -108,95 +290,137 @@ class JobsDatabase:
             conn.commit()
             return True
 
-    def store_job(self, job: JobPosting, company_name: CompanyScrapers):
-        """Store a single job in the database. If job exists, it will be replaced."""
-        import json
+    @staticmethod
+    def _job_row(job: JobPosting, company_name: CompanyScrapers) -> tuple:
+        """Column values for INSERT_JOB_SQL"""
+        return (
+            job.id,
+            company_name.value,
+            job.title,
+            job.location,
+            json.dumps(job.locations) if job.locations else None,
+            job.posting_url,
+            job.posted_date.isoformat() if job.posted_date else None,
+            job.description,
+            json.dumps(job.requirements) if job.requirements else None,
+            job.salary_range,
+            job.team,
+            json.dumps(job.teams) if job.teams else None,
+            job.level,
+            json.dumps(job.responsibilities) if job.responsibilities else None,
+            json.dumps(job.extra_qualifications) if job.extra_qualifications else None,
+            datetime.now(),
+            job.text_match,
+            job.ai_match,
+            job.ai_match_reason,
+            job.applied_on.isoformat() if job.applied_on else None,
+            job.ai_match_score,
+            job.content_hash,
+        )
 
-        with sqlite3.connect(self.db_path) as conn:
+    def store_job(self, job: JobPosting, company_name: CompanyScrapers):
+        """Store a single job in the database. If job exists, it is updated in place."""
+        with METRICS.timer("db_write_seconds", operation="store_job"), self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO jobs
-                (id, company, title, location, locations, posting_url, posted_date,
-                description, requirements, salary_range, team, teams, level,
-                responsibilities, extra_qualifications, scraped_at, text_match,
-                ai_match, ai_match_reason, applied_on)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                job.id,
-                company_name.value,
-                job.title,
-                job.location,
-                json.dumps(job.locations) if job.locations else None,
-                job.posting_url,
-                job.posted_date.isoformat() if job.posted_date else None,
-                job.description,
-                json.dumps(job.requirements) if job.requirements else None,
-                job.salary_range,
-                job.team,
-                json.dumps(job.teams) if job.teams else None,
-                job.level,
-                json.dumps(job.responsibilities) if job.responsibilities else None,
-                json.dumps(job.extra_qualifications) if job.extra_qualifications else None,
-                datetime.now(),
-                job.text_match if hasattr(job, 'text_match') else False,
-                job.ai_match if hasattr(job, 'ai_match') else False,
-                job.ai_match_reason if hasattr(job, 'ai_match_reason') else None,
-                job.applied_on.isoformat() if hasattr(job, 'applied_on') and job.applied_on else None
-            ))
+            cursor.execute(INSERT_JOB_SQL, self._job_row(job, company_name))
             conn.commit()
+        METRICS.inc("db_rows_written_total", operation="store_job")
+
+    def store_jobs(
+        self,
+        jobs: Iterable[JobPosting],
+        company_name: CompanyScrapers,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+    ) -> int:
+        """
+        Store many jobs over the long-lived connection, one transaction per
+        flush_size rows. Existing jobs are updated in place, keeping their match
+        results and applied_on. Returns the number of rows written.
+        """
+        written = 0
+        for chunk in _chunks(jobs, flush_size):
+            rows = [self._job_row(job, company_name) for job in chunk]
+            with METRICS.timer("db_write_seconds", operation="store_jobs"), self._conn_lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(INSERT_JOB_SQL, rows)
+            written += len(rows)
+            METRICS.inc("db_rows_written_total", len(rows), operation="store_jobs")
+        return written
 
     def get_jobs(self, company_name: Optional[CompanyScrapers] = None, days_old: Optional[int] = None) -> List[JobPosting]:
         """Retrieve jobs from the database with optional filtering"""
-        import json
+        return [row.to_job_posting() for row in self.iter_jobs(company_name, days_old)]
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def iter_jobs(
+        self,
+        company_name: Optional[CompanyScrapers] = None,
+        days_old: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = DEFAULT_FLUSH_SIZE,
+    ) -> Iterator["JobRow"]:
+        """
+        Stream jobs as lazily-decoded JobRows, batch_size rows at a time.
+
+        columns limits the query to a subset of JOB_COLUMNS (e.g. just
+        id, title and extra_qualifications for the text filter), so large
+        columns such as description are never read.
+        """
+        columns = tuple(columns or JOB_COLUMNS)
+        unknown = set(columns) - set(JOB_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown job columns: {sorted(unknown)}")
+
+        query = f"SELECT {', '.join(columns)} FROM jobs"
+        params = []
+
+        if company_name or days_old:
+            query += " WHERE"
+            conditions = []
+
+            if company_name:
+                conditions.append("company = ?")
+                params.append(company_name.value)
+
+            if days_old:
+                conditions.append("scraped_at >= datetime('now', ?)")
+                params.append(f'-{days_old} days')
+
+            query += " " + " AND ".join(conditions)
 
-            query = "SELECT * FROM jobs"
-            params = []
-
-            if company_name or days_old:
-                query += " WHERE"
-                conditions = []
-
-                if company_name:
-                    conditions.append("company = ?")
-                    params.append(company_name.value)
-
-                if days_old:
-                    conditions.append("scraped_at >= datetime('now', ?)")
-                    params.append(f'-{days_old} days')
-
-                query += " " + " AND ".join(conditions)
-
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-
-            return [JobPosting(
-                id=row[0],
-                company=row[1],
-                title=row[2],
-                location=row[3],
-                locations=json.loads(row[4]) if row[4] else None,
-                posting_url=row[5],
-                posted_date=datetime.fromisoformat(row[6]) if row[6] else None,
-                description=row[7],
-                requirements=json.loads(row[8]) if row[8] else None,
-                salary_range=row[9],
-                team=row[10],
-                teams=json.loads(row[11]) if row[11] else None,
-                level=row[12],
-                responsibilities=json.loads(row[13]) if row[13] else None,
-                extra_qualifications=json.loads(row[14]) if row[14] else None,
-                text_match=bool(row[16]),
-                ai_match=bool(row[17]),
-                ai_match_reason=row[18],
-                applied_on=datetime.fromisoformat(row[19]) if row[19] else None
-            ) for row in rows]
+        column_index = {column: i for i, column in enumerate(columns)}
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query, params)
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield JobRow(column_index, row)
+        finally:
+            conn.close()
+
+    def get_job_hashes(self, company_name: CompanyScrapers) -> Dict[str, Optional[str]]:
+        """Map every stored job id of a company to its content_hash (None for rows scraped before hashing)"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "SELECT id, content_hash FROM jobs WHERE company = ?", (company_name.value,)
+            )
+            return dict(cursor)
+
+    def update_content_hashes(self, company_name: CompanyScrapers, hashes: Dict[str, str]) -> int:
+        """Set content_hash on existing jobs without touching any other column"""
+        rows = [(content_hash, company_name.value, job_id) for job_id, content_hash in hashes.items()]
+        with METRICS.timer("db_write_seconds", operation="update_content_hashes"), self._conn_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "UPDATE jobs SET content_hash = ? WHERE company = ? AND id = ?", rows
+                )
+        METRICS.inc("db_rows_written_total", len(rows), operation="update_content_hashes")
+        return len(rows)
 
     def update_text_matches(self, company_name: CompanyScrapers, matched_job_ids: List[str]):
         """Update text_match field for all jobs of a company, setting it True only for specified job IDs"""
-        with sqlite3.connect(self.db_path) as conn:
+        with METRICS.timer("db_write_seconds", operation="update_text_matches"), self._connect() as conn:
             cursor = conn.cursor()
             # First, set all jobs for this company to text_match = False
             cursor.execute("""
@@ -215,16 +439,228 @@ class JobsDatabase:
                 """.format(','.join('?' * len(matched_job_ids))),
                 (company_name.value, *matched_job_ids))
             conn.commit()
+        METRICS.inc("db_rows_written_total", len(matched_job_ids), operation="update_text_matches")
 
-    def update_job_ai_match(self, company_name: CompanyScrapers, job_id: str, is_match: bool, match_reason: str):
-        """Update AI match status and reason for a single job"""
-        with sqlite3.connect(self.db_path) as conn:
+    def update_job_ai_match(self, company_name: CompanyScrapers, job_id: str, is_match: bool, match_reason: str, match_score: Optional[float] = None):
+        """Update AI match status, reason and score for a single job"""
+        with METRICS.timer("db_write_seconds", operation="update_job_ai_match"), self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE jobs
-                SET ai_match = ?,
-                    ai_match_reason = ?
-                WHERE company = ? AND id = ?
-            """, (is_match, match_reason, company_name.value, job_id))
+            cursor.execute(UPDATE_AI_MATCH_SQL, (is_match, match_reason, match_score, company_name.value, job_id))
             conn.commit()
-        print(f"Updated AI match for job {job_id} of company {company_name.value}: {is_match}")
\ No newline at end of file
+        METRICS.inc("db_rows_written_total", operation="update_job_ai_match")
+        print(f"Updated AI match for job {job_id} of company {company_name.value}: {is_match}")
+
+    def update_ai_matches(
+        self, matches: Iterable[AIMatch], flush_size: int = DEFAULT_FLUSH_SIZE
+    ) -> int:
+        """Bulk version of update_job_ai_match. Returns the number of verdicts written."""
+        written = 0
+        for chunk in _chunks(matches, flush_size):
+            rows = [
+                (is_match, match_reason, match_score, company_name.value, job_id)
+                for company_name, job_id, is_match, match_reason, match_score in chunk
+            ]
+            with METRICS.timer("db_write_seconds", operation="update_ai_matches"), self._conn_lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(UPDATE_AI_MATCH_SQL, rows)
+            written += len(rows)
+            METRICS.inc("db_rows_written_total", len(rows), operation="update_ai_matches")
+        return written
+
+    def get_cached_verdicts(self, cache_keys: Iterable[str]) -> Dict[str, Tuple[bool, str, Optional[float]]]:
+        """
+        Look up cached LLM verdicts by key, returning
+        {key: (is_match, answer, score)} for the hits. Hits are marked as used
+        for LRU eviction.
+        """
+        hits = {}
+        now = datetime.now()
+        for chunk in _chunks(cache_keys, DEFAULT_FLUSH_SIZE):
+            placeholders = ",".join("?" * len(chunk))
+            with self._conn_lock:
+                conn = self._connection()
+                with conn:
+                    rows = conn.execute(
+                        f"SELECT cache_key, is_match, answer, score FROM ai_verdicts WHERE cache_key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    conn.executemany(
+                        "UPDATE ai_verdicts SET last_used_at = ? WHERE cache_key = ?",
+                        [(now, row[0]) for row in rows],
+                    )
+            hits.update({row[0]: (bool(row[1]), row[2], row[3]) for row in rows})
+        return hits
+
+    def store_cached_verdicts(self, verdicts: Iterable[Tuple[str, bool, str, Optional[float]]]) -> int:
+        """Insert or refresh (cache_key, is_match, answer, score) entries in the verdict cache"""
+        now = datetime.now()
+        rows = [(key, is_match, answer, score, now, now) for key, is_match, answer, score in verdicts]
+        with METRICS.timer("db_write_seconds", operation="store_cached_verdicts"), self._conn_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO ai_verdicts
+                    (cache_key, is_match, answer, score, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        METRICS.inc("db_rows_written_total", len(rows), operation="store_cached_verdicts")
+        return len(rows)
+
+    def evict_cached_verdicts(
+        self, max_entries: Optional[int] = None, max_age_days: Optional[int] = None
+    ) -> int:
+        """
+        Drop verdicts unused for max_age_days, then the least recently used
+        ones beyond max_entries. Returns the number of entries removed.
+        """
+        removed = 0
+        with self._conn_lock:
+            conn = self._connection()
+            with conn:
+                if max_age_days is not None:
+                    removed += conn.execute(
+                        "DELETE FROM ai_verdicts WHERE last_used_at < datetime('now', 'localtime', ?)",
+                        (f"-{max_age_days} days",),
+                    ).rowcount
+                if max_entries is not None:
+                    removed += conn.execute(
+                        """
+                        DELETE FROM ai_verdicts WHERE cache_key IN (
+                            SELECT cache_key FROM ai_verdicts
+                            ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (max_entries,),
+                    ).rowcount
+        return removed
+
+    def get_embeddings(self, content_hashes: Iterable[str]) -> Dict[str, bytes]:
+        """Return the stored float32 vector bytes for every known content hash"""
+        vectors = {}
+        for chunk in _chunks(content_hashes, DEFAULT_FLUSH_SIZE):
+            placeholders = ",".join("?" * len(chunk))
+            with self._conn_lock:
+                rows = self._connection().execute(
+                    f"SELECT content_hash, vector FROM embeddings WHERE content_hash IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            vectors.update(rows)
+        return vectors
+
+    def store_embeddings(self, embeddings: Iterable[Tuple[str, str, int, bytes]]) -> int:
+        """Store (content_hash, model, dimensions, vector bytes) entries"""
+        now = datetime.now()
+        rows = [(*embedding, now) for embedding in embeddings]
+        with METRICS.timer("db_write_seconds", operation="store_embeddings"), self._conn_lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO embeddings
+                    (content_hash, model, dimensions, vector, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        METRICS.inc("db_rows_written_total", len(rows), operation="store_embeddings")
+        return len(rows)
+
+    def batch_writer(self, flush_size: int = DEFAULT_FLUSH_SIZE) -> "BatchWriter":
+        """Buffer job and AI-match writes, flushing every flush_size rows"""
+        return BatchWriter(self, flush_size)
+
+
+class JobRow:
+    """
+    Read-only view of one jobs row. JSON, timestamp and boolean columns are
+    decoded on first access and cached, so callers only pay for the fields
+    they touch. Exposes the same attribute names as JobPosting.
+    """
+
+    __slots__ = ("_column_index", "_row", "_decoded")
+
+    def __init__(self, column_index: Dict[str, int], row: tuple):
+        self._column_index = column_index
+        self._row = row
+        self._decoded: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._decoded[name]
+        except KeyError:
+            pass
+        try:
+            raw = self._row[self._column_index[name]]
+        except KeyError:
+            raise AttributeError(f"Column {name!r} was not selected") from None
+
+        if name in JSON_COLUMNS:
+            value = json.loads(raw) if raw else None
+        elif name in TIMESTAMP_COLUMNS:
+            value = datetime.fromisoformat(raw) if raw else None
+        elif name in BOOLEAN_COLUMNS:
+            value = bool(raw)
+        else:
+            value = raw
+        self._decoded[name] = value
+        return value
+
+    def to_job_posting(self) -> JobPosting:
+        """Decode every selected column into a JobPosting"""
+        return JobPosting(**{column: getattr(self, column) for column in self._column_index})
+
+
+class BatchWriter:
+    """
+    Streams writes into a JobsDatabase in batches. Use as a context manager so
+    the remaining buffered rows are flushed on exit. Safe to share between threads.
+    """
+
+    def __init__(self, db: JobsDatabase, flush_size: int = DEFAULT_FLUSH_SIZE):
+        self.db = db
+        self.flush_size = flush_size
+        self._jobs: List[Tuple[JobPosting, CompanyScrapers]] = []
+        self._ai_matches: List[AIMatch] = []
+        self._lock = threading.Lock()
+
+    def add_job(self, job: JobPosting, company_name: CompanyScrapers):
+        with self._lock:
+            self._jobs.append((job, company_name))
+            if len(self._jobs) >= self.flush_size:
+                self._flush_jobs()
+
+    def add_ai_match(self, company_name: CompanyScrapers, job_id: str, is_match: bool, match_reason: str, match_score: Optional[float] = None):
+        with self._lock:
+            self._ai_matches.append((company_name, job_id, is_match, match_reason, match_score))
+            if len(self._ai_matches) >= self.flush_size:
+                self._flush_ai_matches()
+
+    def _flush_jobs(self):
+        jobs, self._jobs = self._jobs, []
+        by_company = {}
+        for job, company_name in jobs:
+            by_company.setdefault(company_name, []).append(job)
+        for company_name, company_jobs in by_company.items():
+            self.db.store_jobs(company_jobs, company_name, flush_size=len(company_jobs))
+
+    def _flush_ai_matches(self):
+        matches, self._ai_matches = self._ai_matches, []
+        if matches:
+            # A verdict's job may still be buffered; it must exist to be updated
+            self._flush_jobs()
+            self.db.update_ai_matches(matches, flush_size=len(matches))
+
+    def flush(self):
+        with self._lock:
+            self._flush_jobs()
+            self._flush_ai_matches()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
\ No newline at end of file
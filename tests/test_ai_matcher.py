@@ -0,0 +1,149 @@
+import time
+from dataclasses import replace
+
+import pytest
+
+from src.benchmarks.ollama_stub import generate_handler
+from src.benchmarks.stub_server import StubServer
+from src.filters import ai_matcher
+from src.filters.ai_matcher import AIMatcher, OllamaClient
+from src.models.job import JobPosting
+from src.storage.jobs_db import JobsDatabase
+
+RESUME = "B.S. Computer Science. Python, C++, distributed systems internships."
+LATENCY = 0.1
+
+
+def make_job(i, **fields):
+    values = {
+        "title": f"Software Engineer {i}",
+        "requirements": ["Python", "Go"],
+        "extra_qualifications": ["Bachelor's Degree in Computer Science"],
+        **fields,
+    }
+    return JobPosting(company="meta", id=str(i), **values)
+
+
+@pytest.fixture(scope="module")
+def ollama():
+    with StubServer(generate_handler, latency=LATENCY) as server:
+        yield server
+
+
+def make_matcher(ollama, **options):
+    max_in_flight = options.pop("max_in_flight", 4)
+    client = OllamaClient(base_url=ollama.url, max_retries=0, pool_size=max_in_flight)
+    return AIMatcher(RESUME, client=client, max_in_flight=max_in_flight, **options)
+
+
+def test_cache_key_is_stable():
+    matcher = AIMatcher(RESUME, client=OllamaClient())
+    assert matcher.cache_key(make_job(1)) == matcher.cache_key(make_job(1))
+    assert matcher.cache_key(make_job(1)) == AIMatcher(RESUME, client=OllamaClient()).cache_key(make_job(1))
+    # The id and fields outside the prompt don't change the verdict
+    moved = replace(make_job(1), id="other", location="Remote", posting_url="https://example.com")
+    assert matcher.cache_key(make_job(1)) == matcher.cache_key(moved)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"title": "Senior Software Engineer"},
+        {"requirements": ["Python"]},
+        {"extra_qualifications": ["Master's Degree in Computer Science"]},
+    ],
+)
+def test_cache_key_tracks_job_content(change):
+    matcher = AIMatcher(RESUME, client=OllamaClient())
+    assert matcher.cache_key(make_job(1)) != matcher.cache_key(make_job(1, **change))
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"model": "llama3"},
+        {"prompt_mode": "inline"},
+        {"structured": False},
+    ],
+)
+def test_cache_key_tracks_model_and_prompt(options):
+    job = make_job(1)
+    base = AIMatcher(RESUME, client=OllamaClient()).cache_key(job)
+    assert AIMatcher(RESUME, client=OllamaClient(), **options).cache_key(job) != base
+    assert AIMatcher(RESUME + " Go.", client=OllamaClient()).cache_key(job) != base
+
+
+def test_cache_key_tracks_prompt_version(monkeypatch):
+    job = make_job(1)
+    base = AIMatcher(RESUME, client=OllamaClient()).cache_key(job)
+    monkeypatch.setattr(ai_matcher, "PROMPT_VERSION", ai_matcher.PROMPT_VERSION + 1)
+    assert AIMatcher(RESUME, client=OllamaClient()).cache_key(job) != base
+
+
+def test_prompts_run_concurrently(ollama):
+    jobs = [make_job(i) for i in range(8)]
+    with make_matcher(ollama, max_in_flight=4) as matcher:
+        start = time.perf_counter()
+        verdicts = list(matcher.iter_verdicts(jobs))
+        elapsed = time.perf_counter() - start
+
+    assert [verdict.job for verdict in verdicts] == jobs
+    assert not any(verdict.error for verdict in verdicts)
+    assert all(0 <= verdict.score <= 1 for verdict in verdicts)
+    # Eight prompts, four at a time: two rounds of latency rather than eight
+    assert elapsed < 5 * LATENCY
+    assert matcher.stats.requests == 8
+
+
+@pytest.mark.parametrize("prompt_mode", ["inline", "system", "context"])
+def test_verdicts_agree_across_concurrency(ollama, prompt_mode):
+    jobs = [make_job(i) for i in range(6)]
+    with make_matcher(ollama, max_in_flight=1, prompt_mode=prompt_mode) as matcher:
+        serial = [(v.is_match, v.answer) for v in matcher.iter_verdicts(jobs)]
+    with make_matcher(ollama, max_in_flight=6, prompt_mode=prompt_mode) as matcher:
+        concurrent = [(v.is_match, v.answer) for v in matcher.iter_verdicts(jobs)]
+    assert serial == concurrent
+
+
+def test_cached_verdicts_skip_the_model(ollama, tmp_path):
+    jobs = [make_job(i) for i in range(10)]
+    with JobsDatabase(tmp_path / "jobs.db") as db:
+        with make_matcher(ollama, cache=db) as matcher:
+            first = list(matcher.iter_verdicts(jobs))
+        requests_before = ollama.request_count
+        with make_matcher(ollama, cache=db) as matcher:
+            second = list(matcher.iter_verdicts(jobs + [make_job(10)]))
+
+        assert ollama.request_count - requests_before == 1
+        assert [v.cached for v in second] == [True] * 10 + [False]
+        assert [(v.is_match, v.answer, v.score) for v in second[:10]] == [
+            (v.is_match, v.answer, v.score) for v in first
+        ]
+
+        # The streaming path reads the same cache
+        with make_matcher(ollama, cache=db) as matcher:
+            assert matcher.match_cached(make_job(3)).cached
+            assert matcher.match_cached(make_job(3, title="Changed")).cached is False
+
+
+@pytest.mark.parametrize(
+    "answer",
+    ['{"match": "yes", "score": 0.5, "reason": "x"}', '{"match": true}', "YES, a good fit"],
+)
+def test_malformed_structured_answers_are_errors(answer):
+    verdict = AIMatcher.parse_structured(make_job(1), answer)
+    assert verdict.error and verdict.is_match is False
+
+
+def test_structured_scores_are_clamped():
+    verdict = AIMatcher.parse_structured(make_job(1), '{"match": true, "score": 1.7, "reason": " Fits. "}')
+    assert (verdict.is_match, verdict.score, verdict.answer, verdict.error) == (True, 1.0, "Fits.", None)
+
+
+def test_errors_are_returned_on_the_verdict():
+    # Nothing listens on port 9 (discard), so every request fails to connect
+    client = OllamaClient(base_url="http://127.0.0.1:9", max_retries=0, timeout=1)
+    with AIMatcher(RESUME, client=client) as matcher:
+        verdicts = list(matcher.iter_verdicts([make_job(1), make_job(2)]))
+    assert [verdict.is_match for verdict in verdicts] == [False, False]
+    assert all(verdict.error for verdict in verdicts)
@@ -0,0 +1,122 @@
+import pytest
+
+from src.actions.scrape_jobs import RANKED_OUT_REASON, prerank_jobs_by_embeddings
+from src.benchmarks.ollama_stub import generate_handler
+from src.benchmarks.stub_server import StubServer
+from src.filters.ai_matcher import OllamaClient
+from src.filters.embeddings import EmbeddingRanker
+from src.models.company import CompanyScrapers
+from src.models.job import JobPosting
+from src.storage.jobs_db import JobsDatabase
+
+RESUME = "python backend engineer distributed systems sql"
+
+
+@pytest.fixture(scope="module")
+def ollama():
+    with StubServer(generate_handler) as server:
+        yield server
+
+
+@pytest.fixture
+def db(tmp_path):
+    with JobsDatabase(tmp_path / "jobs.db") as db:
+        yield db
+
+
+def make_ranker(ollama, db, **options):
+    return EmbeddingRanker(RESUME, db, client=OllamaClient(base_url=ollama.url), **options)
+
+
+def make_jobs():
+    return [
+        JobPosting(company="meta", id="designer", title="Product Designer", requirements=["figma sketching"]),
+        JobPosting(company="meta", id="backend", title="Python Backend Engineer", requirements=["distributed systems", "sql"]),
+        JobPosting(company="meta", id="data", title="Data Engineer", requirements=["python sql"]),
+        JobPosting(company="meta", id="sales", title="Account Executive", extra_qualifications=["quota carrying"]),
+    ]
+
+
+def test_rank_orders_jobs_by_similarity(ollama, db):
+    ranked = make_ranker(ollama, db).rank(make_jobs())
+    scores = [score for _, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert [job.id for job, _ in ranked][:2] == ["backend", "data"]
+    assert all(-1.0 <= score <= 1.0 for score in scores)
+    assert make_ranker(ollama, db).rank([]) == []
+
+
+def test_top_k_keeps_the_best_jobs(ollama, db):
+    jobs = make_jobs()
+    ranked = [job for job, _ in make_ranker(ollama, db).rank(jobs)]
+    assert make_ranker(ollama, db, top_k=2).select(jobs) == ranked[:2]
+    assert make_ranker(ollama, db, top_k=10).select(jobs) == ranked
+
+
+def test_min_score_drops_dissimilar_jobs(ollama, db):
+    jobs = make_jobs()
+    ranked = make_ranker(ollama, db).rank(jobs)
+    threshold = ranked[1][1]
+    assert make_ranker(ollama, db, min_score=threshold).select(jobs) == [
+        job for job, score in ranked if score >= threshold
+    ]
+    # Both limits apply together
+    assert make_ranker(ollama, db, min_score=threshold, top_k=1).select(jobs) == [ranked[0][0]]
+
+
+def test_partition_reports_the_ranked_out_jobs(ollama, db):
+    jobs = make_jobs()
+    ranked = make_ranker(ollama, db).rank(jobs)
+
+    selected, ranked_out = make_ranker(ollama, db, top_k=2).partition(jobs)
+    assert selected == [job for job, _ in ranked[:2]]
+    assert ranked_out == [(job, score, rank) for rank, (job, score) in enumerate(ranked, start=1)][2:]
+
+    # A job under min_score is ranked out even while top_k has room
+    threshold = ranked[1][1]
+    selected, ranked_out = make_ranker(ollama, db, min_score=threshold, top_k=10).partition(jobs)
+    assert selected == [job for job, _ in ranked[:2]]
+    assert [rank for _, _, rank in ranked_out] == [3, 4]
+
+
+def test_stored_embeddings_are_reused(ollama, db):
+    jobs = make_jobs()
+    first = make_ranker(ollama, db).rank(jobs)
+    requests = ollama.request_count
+
+    # A new ranker reads every vector back from the database
+    assert make_ranker(ollama, db).rank(jobs) == first
+    assert ollama.request_count == requests
+
+    # Only the new posting is embedded
+    new_job = JobPosting(company="meta", id="new", title="SQL Analyst")
+    ranker = make_ranker(ollama, db)
+    ranker.rank(jobs + [new_job])
+    assert ollama.request_count == requests + 1
+    assert len(db.get_embeddings([ranker.content_hash(ranker.job_text(new_job))])) == 1
+
+
+def test_embedding_model_is_part_of_the_key(ollama, db):
+    jobs = make_jobs()
+    make_ranker(ollama, db).rank(jobs)
+    requests = ollama.request_count
+    make_ranker(ollama, db, model="other-embed").rank(jobs)
+    assert ollama.request_count > requests
+
+
+def test_prerank_marks_ranked_out_jobs_and_leaves_a_passed_client_open(ollama, db, monkeypatch):
+    jobs = make_jobs()
+    db.store_jobs(jobs, CompanyScrapers.META)
+    client = OllamaClient(base_url=ollama.url)
+    closed = []
+    monkeypatch.setattr(client, "close", lambda: closed.append(client))
+
+    selected = prerank_jobs_by_embeddings(jobs, RESUME, db, top_k=2, client=client)
+
+    assert [job.id for job in selected] == ["backend", "data"]
+    assert closed == []
+    stored = {job.id: job for job in db.get_jobs(CompanyScrapers.META)}
+    for job_id in ("designer", "sales"):
+        assert stored[job_id].ai_match is False
+        assert stored[job_id].ai_match_reason.startswith(RANKED_OUT_REASON)
+    assert stored["backend"].ai_match_reason is None
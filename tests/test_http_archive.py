@@ -0,0 +1,154 @@
+import gzip
+import json
+
+import pytest
+
+from src.actions.scrape_jobs import ScrapeStats, replay_db_path, scrape_jobs_for_company
+from src.benchmarks.scrape_replay import record_microsoft
+from src.benchmarks.stub_server import StubServer
+from src.models.company import CompanyScrapers
+from src.scrapers.http_archive import RECORD, REPLAY, ArchiveMiss, HttpArchive
+from src.scrapers.http_client import HttpClient
+from src.scrapers.rate_limiter import RateLimiter
+from src.storage.jobs_db import JobsDatabase
+
+
+class Counter:
+    """Stub that numbers its responses, so replay order is visible"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, method, path, body):
+        self.count += 1
+        return 200, "application/json", json.dumps(
+            {"method": method, "path": path, "body": body.decode(), "n": self.count}
+        ).encode()
+
+
+def record(path, requests):
+    """Send requests through a recording client and save the archive"""
+    with StubServer(Counter()) as server:
+        client = HttpClient(
+            use_tor=False,
+            archive=HttpArchive(path, mode=RECORD),
+            rate_limiter=RateLimiter(initial_rate=1000, burst=100),
+        )
+        with client:
+            responses = [
+                client.request(method, f"{server.url}{target}", **kwargs).json()
+                for method, target, kwargs in requests
+            ]
+        return server.url, responses
+
+
+def test_record_replay_round_trip(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    base_url, recorded = record(path, [
+        ("GET", "/jobs?page=1", {}),
+        ("POST", "/graphql", {"data": "query=a"}),
+        ("POST", "/graphql", {"data": "query=b"}),
+    ])
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+    with HttpClient(archive=HttpArchive(path)) as client:
+        assert client.tor_controller is None
+        replayed = [
+            client.get(f"{base_url}/jobs?page=1").json(),
+            # Bodies are part of the key, so the two POSTs stay apart
+            client.post(f"{base_url}/graphql", data="query=b").json(),
+            client.post(f"{base_url}/graphql", data="query=a").json(),
+        ]
+    assert replayed == [recorded[0], recorded[2], recorded[1]]
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    base_url, recorded = record(path, [("GET", "/jobs", {})] * 2)
+
+    archive = HttpArchive(path)
+    assert [archive.replay("GET", f"{base_url}/jobs").json()["n"] for _ in range(3)] == [1, 2, 2]
+
+
+def test_unrecorded_request_misses(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    base_url, _ = record(path, [("GET", "/jobs", {})])
+
+    archive = HttpArchive(path)
+    with pytest.raises(ArchiveMiss):
+        archive.replay("GET", f"{base_url}/other")
+    with pytest.raises(ArchiveMiss):
+        archive.replay("POST", f"{base_url}/jobs")
+    assert archive.misses == 2
+
+
+def test_added_entries_round_trip(tmp_path):
+    path = tmp_path / "run.jsonl.gz"
+    archive = HttpArchive(path, mode=RECORD)
+    archive.add("GET", "https://example.com/a", 404, b"\x00\xffbinary", headers={"ETag": '"a"'})
+    archive.add("POST", "https://example.com/b", 200, b"{}", json_body={"z": 1, "a": 2})
+    archive.save()
+
+    replay = HttpArchive(path, mode=REPLAY)
+    assert len(replay) == 2
+    missing = replay.replay("GET", "https://example.com/a")
+    assert (missing.status_code, missing.ok, missing.content, missing.headers) == (
+        404, False, b"\x00\xffbinary", {"ETag": '"a"'},
+    )
+    # JSON bodies match regardless of key order
+    assert replay.replay("POST", "https://example.com/b", json_body={"a": 2, "z": 1}).json() == {}
+    # Saving a replay is a no-op
+    replay.save()
+    assert len(HttpArchive(path)) == 2
+
+
+def test_replayed_scrape_stores_every_job(tmp_path):
+    path = tmp_path / "microsoft.jsonl.gz"
+    archive = HttpArchive(path, mode=RECORD)
+    record_microsoft(archive, 120)
+    archive.save()
+
+    with JobsDatabase(replay_db_path(path)) as db:
+        replay = HttpArchive(path)
+        jobs = scrape_jobs_for_company(
+            CompanyScrapers.MICROSOFT, force_refresh=True,
+            http_client=HttpClient(archive=replay), db=db,
+        )
+        stored = db.get_jobs(CompanyScrapers.MICROSOFT)
+    assert replay.misses == 0
+    assert len(jobs) == 120
+    assert sorted(job.id for job in stored) == sorted(str(i) for i in range(120))
+    assert all(job.extra_qualifications for job in stored)
+
+
+
+def test_detail_pages_without_details_count_as_failures(tmp_path):
+    path = tmp_path / "microsoft.jsonl.gz"
+    archive = HttpArchive(path, mode=RECORD)
+    record_microsoft(archive, 30)
+    archive.save()
+    # Fail the detail pages of every job whose id ends in 7
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    for entry in entries:
+        if "/job/" in entry["url"] and entry["url"].split("?")[0].endswith("7"):
+            entry["status"] = 404
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.writelines(json.dumps(entry) + "\n" for entry in entries)
+
+    stats = ScrapeStats(company="microsoft")
+    with JobsDatabase(replay_db_path(path)) as db:
+        jobs = scrape_jobs_for_company(
+            CompanyScrapers.MICROSOFT, stats=stats,
+            http_client=HttpClient(archive=HttpArchive(path)), db=db,
+        )
+        stored = db.get_jobs(CompanyScrapers.MICROSOFT)
+    assert (len(jobs), stats.jobs_failed) == (27, 3)
+    assert sorted(job.id for job in stored) == sorted(str(i) for i in range(30) if i % 10 != 7)
+
+
+def test_replay_db_path_sits_next_to_the_archive(tmp_path):
+    assert replay_db_path(tmp_path / "meta.jsonl.gz") == tmp_path / "meta.replay.db"
+    assert replay_db_path("fixtures/run").name == "run.replay.db"
@@ -0,0 +1,158 @@
+import pytest
+
+from src.benchmarks.stub_server import StubServer
+from src.scrapers.http_archive import ArchivedResponse
+from src.scrapers.http_cache import HttpCache
+from src.scrapers.http_client import HttpClient
+from src.scrapers.rate_limiter import RateLimiter
+
+LAST_MODIFIED = "Wed, 01 May 2024 00:00:00 GMT"
+
+
+class JobPage:
+    """Stub detail page that honours conditional requests"""
+
+    def __init__(self, content=b"<html>v1</html>", etag='"v1"', cache_control=None):
+        self.content = content
+        self.etag = etag
+        self.cache_control = cache_control
+        self.conditional = []
+
+    def __call__(self, method, path, body, headers):
+        headers = {name.lower(): value for name, value in headers.items()}
+        self.conditional.append(
+            (headers.get("if-none-match"), headers.get("if-modified-since"))
+        )
+        response_headers = {"Last-Modified": LAST_MODIFIED}
+        if self.etag:
+            response_headers["ETag"] = self.etag
+        if self.cache_control:
+            response_headers["Cache-Control"] = self.cache_control
+        if self.etag and headers.get("if-none-match") == self.etag:
+            return 304, "text/html", b"", response_headers
+        return 200, "text/html", self.content, response_headers
+
+
+@pytest.fixture
+def page():
+    return JobPage()
+
+
+@pytest.fixture
+def server(page):
+    with StubServer(page, pass_headers=True) as server:
+        yield server
+
+
+def make_client(tmp_path, **cache_options):
+    cache = HttpCache(tmp_path / "http_cache.db", **cache_options)
+    return HttpClient(
+        use_tor=False, cache=cache, rate_limiter=RateLimiter(initial_rate=1000, burst=100)
+    )
+
+
+def test_fresh_page_is_served_from_disk(tmp_path, server, page):
+    url = f"{server.url}/job/1"
+    with make_client(tmp_path) as client:
+        first = client.get(url, cacheable=True)
+        second = client.get(url, cacheable=True)
+        assert (first.status_code, first.content) == (200, b"<html>v1</html>")
+        assert (second.status_code, second.content) == (200, b"<html>v1</html>")
+        assert server.request_count == 1
+        assert (client.cache.hits, client.cache.misses) == (1, 1)
+
+
+def test_stale_page_is_revalidated(tmp_path, server, page):
+    url = f"{server.url}/job/1"
+    with make_client(tmp_path, ttl=0) as client:
+        client.get(url, cacheable=True)
+        stored_at = client.cache.get(url).stored_at
+        response = client.get(url, cacheable=True)
+
+        assert server.request_count == 2
+        assert page.conditional == [(None, None), ('"v1"', LAST_MODIFIED)]
+        # The 304 has no body; the cached one is served and its TTL restarts
+        assert (response.status_code, response.content) == (200, b"<html>v1</html>")
+        assert client.cache.not_modified == 1
+        assert client.cache.get(url).stored_at > stored_at
+
+
+def test_changed_page_replaces_the_cached_copy(tmp_path, server, page):
+    url = f"{server.url}/job/1"
+    with make_client(tmp_path, ttl=0) as client:
+        client.get(url, cacheable=True)
+        page.content, page.etag = b"<html>v2</html>", '"v2"'
+        response = client.get(url, cacheable=True)
+
+        assert response.content == b"<html>v2</html>"
+        cached = client.cache.get(url)
+        assert (cached.content, cached.etag) == (b"<html>v2</html>", '"v2"')
+
+
+def test_revalidate_bypasses_a_fresh_page(tmp_path, server, page):
+    url = f"{server.url}/job/1"
+    with make_client(tmp_path) as client:
+        client.get(url, cacheable=True)
+        page.content, page.etag = b"<html>v2</html>", '"v2"'
+        assert client.get(url, cacheable=True).content == b"<html>v1</html>"
+        assert client.get(url, cacheable=True, revalidate=True).content == b"<html>v2</html>"
+        assert server.request_count == 2
+
+
+def test_revalidating_cache_never_serves_without_asking(tmp_path, server, page):
+    url = f"{server.url}/job/1"
+    with make_client(tmp_path, revalidate=True) as client:
+        client.get(url, cacheable=True)
+        client.get(url, cacheable=True)
+        assert server.request_count == 2
+        assert client.cache.not_modified == 1
+
+
+def test_uncacheable_requests_skip_the_cache(tmp_path, server):
+    url = f"{server.url}/job/1"
+    with make_client(tmp_path) as client:
+        client.get(url)
+        client.get(url)
+        client.post(url, cacheable=True)
+        assert server.request_count == 3
+        assert client.cache.get(url) is None
+
+
+def test_no_store_pages_are_not_cached(tmp_path):
+    page = JobPage(cache_control="private, no-store")
+    with StubServer(page, pass_headers=True) as server, make_client(tmp_path) as client:
+        client.get(f"{server.url}/job/1", cacheable=True)
+        client.get(f"{server.url}/job/1", cacheable=True)
+        assert server.request_count == 2
+        assert client.cache.get(f"{server.url}/job/1") is None
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = HttpCache(tmp_path / "http_cache.db", max_bytes=250)
+    try:
+        for name in ("a", "b", "c"):
+            cache.store(f"https://example.com/{name}", ArchivedResponse(name, 200, {}, b"x" * 100))
+            if name == "b":
+                # Using "a" makes "b" the least recently used page
+                cache.hit(cache.get("https://example.com/a"))
+        assert cache.get("https://example.com/a") is not None
+        assert cache.get("https://example.com/b") is None
+        assert cache.get("https://example.com/c") is not None
+    finally:
+        cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "http_cache.db"
+    cache = HttpCache(path)
+    cache.store("https://example.com/a", ArchivedResponse("a", 200, {"ETag": '"a"'}, b"page"))
+    cache.close()
+
+    cache = HttpCache(path)
+    try:
+        page = cache.get("https://example.com/a")
+        assert (page.content, page.etag) == (b"page", '"a"')
+        assert cache.is_fresh(page)
+        assert cache.conditional_headers(page) == {"If-None-Match": '"a"'}
+    finally:
+        cache.close()
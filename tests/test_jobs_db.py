@@ -0,0 +1,226 @@
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+
+import pytest
+
+from src.models.company import CompanyScrapers
+from src.models.job import JobPosting
+from src.storage import jobs_db
+from src.storage.jobs_db import MIGRATIONS, JobsDatabase
+
+# The jobs table as the first release created it, before schema_version existed
+BASELINE_SCHEMA = """
+    CREATE TABLE jobs (
+        id TEXT,
+        company TEXT,
+        title TEXT NOT NULL,
+        location TEXT,
+        locations TEXT,
+        posting_url TEXT,
+        posted_date TIMESTAMP,
+        description TEXT,
+        requirements TEXT,
+        salary_range TEXT,
+        team TEXT,
+        teams TEXT,
+        level TEXT,
+        responsibilities TEXT,
+        extra_qualifications TEXT,
+        scraped_at TIMESTAMP,
+        text_match BOOLEAN DEFAULT FALSE,
+        ai_match BOOLEAN DEFAULT FALSE,
+        ai_match_reason TEXT,
+        applied_on TIMESTAMP,
+        PRIMARY KEY (id, company)
+    )
+"""
+
+ALL_VERSIONS = [version for version, _ in MIGRATIONS]
+LATEST_VERSION = ALL_VERSIONS[-1]
+
+
+@pytest.fixture
+def db(tmp_path):
+    with JobsDatabase(tmp_path / "jobs.db") as db:
+        yield db
+
+
+def make_job(job_id, **fields):
+    return JobPosting(company="meta", title=f"Software Engineer {job_id}", id=job_id, **fields)
+
+
+def stored(db):
+    return {job.id: job for job in db.get_jobs(CompanyScrapers.META)}
+
+
+def versions(path):
+    with closing(sqlite3.connect(path)) as conn:
+        return [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+def schema_names(path):
+    with closing(sqlite3.connect(path)) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+
+
+def columns(path, table):
+    with closing(sqlite3.connect(path)) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_fresh_database_gets_every_migration(tmp_path):
+    path = tmp_path / "jobs.db"
+    JobsDatabase(path).close()
+    assert versions(path) == ALL_VERSIONS
+    assert "idx_jobs_company_scraped_at" in schema_names(path)
+    with closing(sqlite3.connect(path)) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_baseline_database_upgrades_in_place(tmp_path):
+    path = tmp_path / "jobs.db"
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.execute(BASELINE_SCHEMA)
+        conn.execute(
+            "INSERT INTO jobs (id, company, title, text_match, ai_match, ai_match_reason) "
+            "VALUES ('1', 'meta', 'Software Engineer', TRUE, TRUE, 'Good fit')"
+        )
+
+    with JobsDatabase(path) as db:
+        [job] = db.get_jobs(CompanyScrapers.META)
+
+    assert versions(path) == ALL_VERSIONS
+    assert "idx_jobs_company_scraped_at" in schema_names(path)
+    assert (job.title, job.text_match, job.ai_match, job.ai_match_reason) == (
+        "Software Engineer", True, True, "Good fit",
+    )
+
+
+def test_reopening_applies_nothing_twice(tmp_path):
+    path = tmp_path / "jobs.db"
+    JobsDatabase(path).close()
+    JobsDatabase(path).close()
+    assert versions(path) == ALL_VERSIONS
+
+
+def test_concurrent_initialization_applies_each_version_once(tmp_path):
+    path = tmp_path / "jobs.db"
+    errors = []
+
+    def open_database():
+        try:
+            JobsDatabase(path).close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_database) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert versions(path) == ALL_VERSIONS
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    path = tmp_path / "jobs.db"
+    JobsDatabase(path).close()
+    broken = (LATEST_VERSION + 1, [
+        "ALTER TABLE jobs ADD COLUMN half_applied TEXT",
+        "THIS IS NOT SQL",
+    ])
+    monkeypatch.setattr(jobs_db, "MIGRATIONS", MIGRATIONS + [broken])
+
+    with pytest.raises(sqlite3.OperationalError):
+        JobsDatabase(path)
+
+    assert versions(path)[-1] == LATEST_VERSION
+    assert "half_applied" not in columns(path, "jobs")
+
+
+def test_store_jobs_round_trips_postings(db):
+    job = make_job(
+        "1",
+        locations=["Menlo Park, CA", "Remote"],
+        posted_date=datetime(2024, 5, 1, 9, 30),
+        requirements=["Python"],
+        extra_qualifications=["BS in Computer Science"],
+    )
+    assert db.store_jobs([job], CompanyScrapers.META) == 1
+
+    [loaded] = db.get_jobs(CompanyScrapers.META)
+    assert (loaded.id, loaded.title, loaded.locations, loaded.posted_date) == (
+        "1", "Software Engineer 1", ["Menlo Park, CA", "Remote"], datetime(2024, 5, 1, 9, 30),
+    )
+    assert (loaded.requirements, loaded.extra_qualifications) == (
+        ["Python"], ["BS in Computer Science"],
+    )
+
+
+def test_store_jobs_writes_every_chunk(db):
+    jobs = [make_job(str(i)) for i in range(7)]
+    assert db.store_jobs(jobs, CompanyScrapers.META, flush_size=3) == 7
+    assert sorted(stored(db)) == sorted(job.id for job in jobs)
+
+
+def test_storing_a_job_again_updates_it(db):
+    db.store_jobs([make_job("1")], CompanyScrapers.META)
+    db.store_jobs([make_job("1", description="Updated")], CompanyScrapers.META)
+    assert [job.description for job in db.get_jobs(CompanyScrapers.META)] == ["Updated"]
+
+
+def test_batch_writer_flushes_on_size_and_exit(db):
+    with db.batch_writer(flush_size=2) as writer:
+        for i in range(3):
+            writer.add_job(make_job(str(i)), CompanyScrapers.META)
+        # The first two jobs were flushed as soon as the buffer filled
+        assert sorted(stored(db)) == ["0", "1"]
+        writer.add_ai_match(CompanyScrapers.META, "0", True, "Good fit")
+    jobs = stored(db)
+    assert sorted(jobs) == ["0", "1", "2"]
+    assert (jobs["0"].ai_match, jobs["0"].ai_match_reason) == (True, "Good fit")
+    assert jobs["1"].ai_match is False
+
+
+def test_match_updates(db):
+    db.store_jobs([make_job("1"), make_job("2")], CompanyScrapers.META)
+    db.update_text_matches(CompanyScrapers.META, ["2"])
+    db.update_job_ai_match(CompanyScrapers.META, "2", True, "Good fit", 0.8)
+    jobs = stored(db)
+    assert (jobs["1"].text_match, jobs["2"].text_match) == (False, True)
+    assert (jobs["2"].ai_match, jobs["2"].ai_match_reason, jobs["2"].ai_match_score) == (
+        True, "Good fit", 0.8,
+    )
+
+
+def test_upsert_stores_false_flags_and_keeps_verdicts(db):
+    db.store_jobs([make_job("1"), make_job("2")], CompanyScrapers.META)
+    assert [(job.text_match, job.ai_match) for job in stored(db).values()] == [(False, False)] * 2
+
+    db.update_text_matches(CompanyScrapers.META, ["1"])
+    db.update_job_ai_match(CompanyScrapers.META, "1", True, "Good fit", 0.9)
+    # A refresh carries no verdicts, so the stored ones survive it
+    db.store_jobs([make_job("1", description="Updated")], CompanyScrapers.META)
+    job = stored(db)["1"]
+    assert (job.text_match, job.ai_match, job.ai_match_reason, job.ai_match_score) == (
+        True, True, "Good fit", 0.9,
+    )
+    assert job.description == "Updated"
+
+    # An explicit False still overrides
+    db.store_jobs([make_job("1", text_match=False, ai_match=False)], CompanyScrapers.META)
+    job = stored(db)["1"]
+    assert (job.text_match, job.ai_match) == (False, False)
+
+
+def test_content_hashes(db):
+    db.store_jobs(
+        [make_job("1", content_hash="abc"), make_job("2", posted_date=datetime(2024, 1, 2))],
+        CompanyScrapers.META,
+    )
+    assert db.get_job_hashes(CompanyScrapers.META) == {"1": "abc", "2": None}
+    db.update_content_hashes(CompanyScrapers.META, {"2": "def"})
+    assert db.get_job_hashes(CompanyScrapers.META) == {"1": "abc", "2": "def"}
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from src.actions.scrape_jobs import partition_listings
+from src.models.job import HASH_DESCRIPTION_CHARS, JobPosting
+
+
+def listing(job_id="1", **fields):
+    values = {
+        "title": "Software Engineer",
+        "posted_date": datetime(2024, 5, 1),
+        "location": "Seattle, WA",
+        "locations": ["Seattle, WA", "Remote"],
+        "description": "Build things.",
+        **fields,
+    }
+    return JobPosting(company="microsoft", id=job_id, **values)
+
+
+def test_listing_hash_is_stable():
+    assert listing().listing_hash() == listing().listing_hash()
+    assert len(listing().listing_hash()) == 64
+
+
+def test_listing_hash_tracks_listing_fields():
+    base = listing().listing_hash()
+    assert listing(title="Senior Software Engineer").listing_hash() != base
+    assert listing(posted_date=datetime(2024, 5, 2)).listing_hash() != base
+    assert listing(location="Redmond, WA").listing_hash() != base
+    assert listing(locations=["Seattle, WA"]).listing_hash() != base
+    assert listing(description="Build other things.").listing_hash() != base
+
+
+def test_listing_hash_ignores_detail_fields_and_late_description():
+    base = listing(description="x" * HASH_DESCRIPTION_CHARS).listing_hash()
+    # Fields only the detail page fills in don't change the listing
+    assert listing(
+        description="x" * HASH_DESCRIPTION_CHARS,
+        requirements=["Python"],
+        extra_qualifications=["BS"],
+        text_match=True,
+    ).listing_hash() == base
+    assert listing(description="x" * HASH_DESCRIPTION_CHARS + " more").listing_hash() == base
+
+
+def test_partition_listings():
+    unchanged, changed, unhashed, new = listing("1"), listing("2"), listing("3"), listing("4")
+    known = {
+        "1": unchanged.listing_hash(),
+        "2": listing("2", title="Old title").listing_hash(),
+        "3": None,
+    }
+
+    new_jobs, changed_jobs, unhashed_hashes = partition_listings(
+        [unchanged, changed, unhashed, new], known
+    )
+
+    assert new_jobs == [new]
+    assert changed_jobs == [changed]
+    assert unhashed_hashes == {"3": unhashed.listing_hash()}
+    # Every listing carries its hash onto the enriched posting
+    assert all(
+        job.content_hash == job.listing_hash() for job in (unchanged, changed, unhashed, new)
+    )
+
+
+def test_partition_listings_hash_survives_merge():
+    job = listing("1")
+    partition_listings([job], {})
+    enriched = JobPosting(company="microsoft", title=job.title, id="1", requirements=["Python"])
+    assert enriched.merge(job).content_hash == job.listing_hash()
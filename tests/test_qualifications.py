@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from src.benchmarks.text_filter import QUALIFICATIONS, TITLES, synthetic_jobs
+from src.filters.qualifications import (
+    BACHELORS_PATTERN,
+    GRAD_DEGREE_PATTERN,
+    LEADERSHIP_PATTERN,
+    RESEARCH_PATTERN,
+    YEARS_PATTERN,
+    QualificationFilter,
+)
+from src.models.job import JobPosting
+
+# Edge cases for the keyword prefilters in front of each pattern
+EXTRA_TITLES = [
+    "PhD Software Engineer",
+    "Software Engineer (M.S.)",
+    "Lead Software Engineer",
+    "Director of Engineering",
+    "research engineer",
+    "Data  Scientist",
+    "Leadership Development Program Engineer",
+    "",
+]
+EXTRA_QUALIFICATIONS = [
+    "5-7 yrs of industry experience",
+    "ten+ years of experience",
+    "Two&#43; years experience",
+    "2 y of experience",
+    "10 years",
+    "1 year of experience",
+    "Bachelor's or Master's degree",
+    "PhD",
+    "Ph.D. in Physics",
+    "Doctorate (or equivalent)",
+    "Masters in Mathematics",
+    "BS/MS in Computer Science",
+    "Experience with Python, SQL and YAML",
+    "Pythonyears",
+    "",
+]
+
+
+def old_is_entry_level(job, strict=False):
+    """The per-qualification filter QualificationFilter replaced"""
+    title = job.title
+    for qualification in job.extra_qualifications:
+        if GRAD_DEGREE_PATTERN.search(title):
+            return False
+        title = title.lower()
+        if YEARS_PATTERN.search(qualification):
+            return False
+        if strict and GRAD_DEGREE_PATTERN.search(qualification):
+            return False
+        if (
+            not strict
+            and GRAD_DEGREE_PATTERN.search(qualification)
+            and not BACHELORS_PATTERN.search(qualification)
+        ):
+            return False
+        if strict and RESEARCH_PATTERN.search(title):
+            return False
+        if LEADERSHIP_PATTERN.search(title):
+            return False
+    return True
+
+
+def edge_case_jobs(count, seed=0):
+    rng = random.Random(seed)
+    titles = TITLES + EXTRA_TITLES
+    qualifications = QUALIFICATIONS + EXTRA_QUALIFICATIONS
+    return [
+        JobPosting(
+            company="microsoft",
+            title=rng.choice(titles),
+            id=str(i),
+            extra_qualifications=rng.sample(qualifications, rng.randint(0, 5)),
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("jobs", [synthetic_jobs(2000), edge_case_jobs(5000)], ids=["synthetic", "edge_cases"])
+def test_matches_old_filter(jobs, strict):
+    engine = QualificationFilter(strict=strict)
+    for job in jobs:
+        assert engine.check(job).passed == old_is_entry_level(job, strict), (
+            job.title, job.extra_qualifications,
+        )
+
+
+def test_filter_keeps_passing_jobs_in_order():
+    jobs = synthetic_jobs(500)
+    assert QualificationFilter().filter(jobs) == [job for job in jobs if old_is_entry_level(job)]
+
+
+@pytest.mark.parametrize(
+    "title, qualifications, strict, reason",
+    [
+        ("Software Engineer", [], False, None),
+        ("PhD Software Engineer", ["Python"], False, "graduate degree in title"),
+        ("Tech Lead", ["Python"], False, "leadership role"),
+        ("Research Engineer", ["Python"], True, "research role"),
+        ("Research Engineer", ["Python"], False, None),
+        ("Software Engineer", ["3+ years of experience"], False, "years of experience required"),
+        ("Software Engineer", ["Master's degree or Bachelor's degree"], True, "graduate degree required"),
+        ("Software Engineer", ["Master's degree or Bachelor's degree"], False, None),
+        ("Software Engineer", ["PhD in Computer Science"], False, "graduate degree without bachelor's alternative"),
+    ],
+)
+def test_reasons(title, qualifications, strict, reason):
+    job = JobPosting(company="meta", title=title, extra_qualifications=qualifications)
+    result = QualificationFilter(strict=strict).check(job)
+    assert (result.passed, result.reason) == (reason is None, reason)
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from src.scrapers import rate_limiter
+from src.scrapers.rate_limiter import (
+    RATE_DECREASE,
+    RATE_INCREASE,
+    SLOW_START_FACTOR,
+    RateLimiter,
+    parse_retry_after,
+)
+
+HOST = "jobs.example.com"
+
+
+def rate(limiter):
+    return limiter.metrics()[HOST]["rate"]
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("-3") == 0.0
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(when, usegmt=True)) == pytest.approx(30, abs=2)
+    past = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_retry_after_unusable(value):
+    assert parse_retry_after(value) is None
+
+
+def test_burst_then_rate():
+    limiter = RateLimiter(initial_rate=10.0, burst=3)
+    waits = [limiter.reserve(HOST) for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # Each request past the burst queues one token interval behind the last
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)
+
+
+def test_hosts_have_separate_buckets():
+    limiter = RateLimiter(initial_rate=1.0, burst=1)
+    assert limiter.reserve(HOST) == 0.0
+    assert limiter.reserve("other.example.com") == 0.0
+    assert limiter.reserve(HOST) > 0.5
+
+
+def test_slow_start_then_additive_increase():
+    limiter = RateLimiter(initial_rate=2.0)
+    limiter.on_response(HOST, 200)
+    assert rate(limiter) == pytest.approx(2.0 * SLOW_START_FACTOR, abs=1e-3)
+
+    limiter.on_response(HOST, 429, "0")
+    after_throttle = 2.0 * SLOW_START_FACTOR * RATE_DECREASE
+    assert rate(limiter) == pytest.approx(after_throttle, abs=1e-3)
+
+    # Once a host has throttled, successes only add to the rate
+    limiter.on_response(HOST, 200)
+    limiter.on_response(HOST, 200)
+    assert rate(limiter) == pytest.approx(after_throttle + 2 * RATE_INCREASE, abs=1e-3)
+
+
+def test_rate_stays_within_bounds(monkeypatch):
+    limiter = RateLimiter(initial_rate=1.0, min_rate=0.5, max_rate=1.2)
+    for _ in range(20):
+        limiter.on_response(HOST, 200)
+    assert rate(limiter) == 1.2
+
+    monkeypatch.setattr(rate_limiter, "DECREASE_COOLDOWN", 0.0)
+    limiter = RateLimiter(initial_rate=1.0, min_rate=0.5)
+    for _ in range(3):
+        limiter.on_response(HOST, 503, "0")
+    assert rate(limiter) == 0.5
+
+
+def test_throttles_in_flight_cut_the_rate_once():
+    limiter = RateLimiter(initial_rate=4.0)
+    for _ in range(5):
+        limiter.on_response(HOST, 429, "0")
+    assert rate(limiter) == pytest.approx(4.0 * RATE_DECREASE)
+    assert limiter.metrics()[HOST]["throttled"] == 5
+
+
+def test_client_errors_leave_the_rate_alone():
+    limiter = RateLimiter(initial_rate=2.0)
+    assert limiter.on_response(HOST, 404) == 0.0
+    assert rate(limiter) == 2.0
+
+
+def test_retry_after_blocks_the_host():
+    limiter = RateLimiter(initial_rate=10.0, burst=10)
+    assert limiter.on_response(HOST, 429, "3") == 3.0
+    assert limiter.reserve(HOST) == pytest.approx(3.0, abs=0.05)
+    assert limiter.reserve("other.example.com") == 0.0
+
+
+def test_backoff_without_retry_after_grows_with_jitter():
+    limiter = RateLimiter()
+    first = limiter.on_response(HOST, 429)
+    second = limiter.on_response(HOST, 429)
+    third = limiter.on_response(HOST, 429)
+    assert 0.5 <= first <= 1.0
+    assert 1.0 <= second <= 2.0
+    assert 2.0 <= third <= 4.0
+
+    # A success resets the backoff
+    limiter.on_response(HOST, 200)
+    assert 0.5 <= limiter.on_response(HOST, 429) <= 1.0
+
@@ -0,0 +1,119 @@
+import json
+import time
+
+from src.actions.scrape_jobs import iter_job_details, iter_listing_pages
+from src.benchmarks.detail_fetch import StubScraper, _detail_handler
+from src.benchmarks.meta_parse import synthetic_page
+from src.benchmarks.stub_server import StubServer
+from src.models.job import JobPosting
+from src.scrapers.http_archive import ArchivedResponse
+from src.scrapers.http_client import HttpClient
+from src.scrapers.meta import MetaScraper, extract_ld_json, parse_ld_json_with_soup
+from src.scrapers.microsoft import PAGE_SIZE, MicrosoftScraper
+from src.scrapers.rate_limiter import RateLimiter
+
+LATENCY = 0.05
+
+
+class ListingOnlyMeta(MetaScraper):
+    """MetaScraper whose one GraphQL fetch returns a fixed result set"""
+
+    def __init__(self, count, **options):
+        super().__init__(http_client=object(), **options)
+        self.count = count
+        self.fetches = 0
+
+    def fetch_all_listings(self, attempt=0):
+        self.fetches += 1
+        return [JobPosting(company="meta", title="Software Engineer", id=str(i)) for i in range(self.count)]
+
+
+def job_ids(page):
+    return [job.id for job in page.jobs]
+
+
+def test_detail_fetches_run_concurrently():
+    client = HttpClient(use_tor=False, rate_limiter=RateLimiter(initial_rate=1000, burst=100))
+    with StubServer(_detail_handler, latency=LATENCY) as server, StubScraper(client, server.url) as scraper:
+        jobs = [JobPosting(company="stub", title="SWE", id=str(i)) for i in range(40)]
+        start = time.perf_counter()
+        results = list(iter_job_details(scraper, jobs, max_workers=8))
+        elapsed = time.perf_counter() - start
+
+    assert sorted(job.id for job, _, _ in results) == sorted(job.id for job in jobs)
+    assert all(error is None for _, _, error in results)
+    # Failing detail pages come back without details rather than raising
+    failed = {job.id for job, detail, _ in results if detail is None}
+    assert failed == {job.id for job in jobs if job.id.endswith("7")}
+    assert all(
+        detail.extra_qualifications == ["BS in Computer Science", "Python"]
+        for _, detail, _ in results if detail is not None
+    )
+    # 40 requests eight at a time: five rounds of latency, far from forty
+    assert elapsed < 20 * LATENCY
+
+
+def test_ld_json_slicing_matches_the_dom_parse():
+    for i in range(3):
+        page = synthetic_page(i)
+        assert extract_ld_json(page) == parse_ld_json_with_soup(page.decode())
+        assert extract_ld_json(page) is not None
+
+
+def test_ld_json_slicing_skips_mentions_outside_script_tags():
+    page = (
+        b'<p>Served as application/ld+json</p>'
+        b'<script type="application/ld+json">{"title": "Software Engineer"}</script>'
+    )
+    assert extract_ld_json(page) == {"title": "Software Engineer"}
+
+
+def test_ld_json_slicing_gives_up_on_broken_blocks():
+    assert extract_ld_json(b"<html><body>No structured data</body></html>") is None
+    assert extract_ld_json(b'<script type="application/ld+json">{"title": </script>') is None
+    assert extract_ld_json(b'<script type="application/ld+json">{"title": "x"}') is None
+
+
+def test_meta_results_per_page_splits_one_fetch():
+    scraper = ListingOnlyMeta(23, results_per_page=10)
+    pages = list(iter_listing_pages(scraper))
+    assert [len(page.jobs) for page in pages] == [10, 10, 3]
+    assert [page.is_last for page in pages] == [False, False, True]
+    assert [job_id for page in pages for job_id in job_ids(page)] == [str(i) for i in range(23)]
+    assert (pages[0].total_count, pages[0].page_count) == (23, 3)
+    assert scraper.fetches == 1
+
+
+def test_meta_without_page_size_serves_one_last_page():
+    scraper = ListingOnlyMeta(23)
+    first = scraper.get_listing_page(1)
+    assert (len(first.jobs), first.total_count, first.is_last) == (23, 23, True)
+    assert scraper.get_listing_page(2).jobs == []
+    assert scraper.fetches == 1
+
+
+def test_microsoft_null_operation_result_is_an_empty_last_page():
+    scraper = MicrosoftScraper(http_client=object())
+    response = ArchivedResponse("", 200, {}, json.dumps({"operationResult": None}).encode())
+    page = scraper.parse_listing_page(response, page=3)
+    assert (page.jobs, page.page, page.is_last) == ([], 3, True)
+
+
+def test_microsoft_listing_page_reports_the_total():
+    scraper = MicrosoftScraper(http_client=object())
+    jobs = [
+        {
+            "jobId": str(i),
+            "title": "Software Engineer",
+            "postingDate": "2025-01-15T00:00:00+00:00",
+            "properties": {
+                "description": "Build services.",
+                "locations": ["Redmond, Washington, United States"],
+                "primaryLocation": "Redmond, Washington, United States",
+            },
+        }
+        for i in range(PAGE_SIZE)
+    ]
+    body = {"operationResult": {"result": {"jobs": jobs, "totalJobs": PAGE_SIZE * 2 + 1}}}
+    page = scraper.parse_listing_page(ArchivedResponse("", 200, {}, json.dumps(body).encode()))
+    assert (len(page.jobs), page.page_count, page.is_last) == (PAGE_SIZE, 3, False)